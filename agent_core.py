@@ -4,8 +4,9 @@ Agent核心模块
 """
 import asyncio
 import json
-from typing import Dict, Any, Optional, AsyncGenerator
+from typing import Dict, Any, Optional, AsyncGenerator, Tuple
 from datetime import datetime
+from functools import lru_cache
 
 from llm_interface import get_llm_interface, LLMResponse
 from config import get_config
@@ -28,6 +29,47 @@ except ImportError:
     logger.warning("M3编排器模块不可用，将使用传统模式")
 
 
+@lru_cache(maxsize=8)
+def _render_system_prompt(tool_names: Tuple[str, ...]) -> str:
+    """
+    按工具名列表渲染系统提示词（同一组工具只拼接一次）
+
+    Args:
+        tool_names: 可用工具名元组
+
+    Returns:
+        系统提示词
+    """
+    base_prompt = """你是AI个人助理，可以帮助用户处理各种任务。
+
+你具备以下能力：
+1. 基础对话和问答
+2. 工具调用能力 - 你可以调用工具来获取外部信息"""
+
+    if tool_names:
+        base_prompt += f"\n3. 可用工具: {', '.join(tool_names)}"
+
+    base_prompt += """
+
+INSTRUCTIONS:
+You are a helpful AI assistant with access to tools. When a user asks a question that requires external information, you MUST call the appropriate tool.
+
+TOOL USAGE RULES:
+- For time-related questions (current time, day of week, date): Call time_now
+- For weather queries: Call weather_get
+- For math calculations: Call math_calc
+- For calendar/schedule queries: Call calendar_read
+- For email queries: Call email_list
+- For web searches: Call web_search
+- For file reading: Call file_read
+- For file writing: Call file_write (supports path aliases like "桌面", "下载", "文档")
+- For asking user information (location, date, etc.): Call ask_user
+
+IMPORTANT: Always call the appropriate tool when external information is needed. Do not provide generic responses."""
+
+    return base_prompt
+
+
 class AgentCore:
     """Agent核心类"""
 
@@ -569,26 +611,20 @@ class AgentCore:
                         # 将用户答案添加到execution_state中
                         if session.active_task.execution_state:
                             # 查找等待用户输入的步骤，并设置答案
-                            ask_user_pending = session.active_task.execution_state.get_artifact("ask_user_pending")
+                            ask_user_pending = session.active_task.execution_state.ask_user_pending
                             if ask_user_pending and isinstance(ask_user_pending, dict):
                                 output_key = ask_user_pending.get("output_key", "user_location")
                                 session.active_task.execution_state.set_artifact(output_key, user_answer)
                                 # 清除ask_user_pending状态，防止重复询问
-                                session.active_task.execution_state.set_artifact("ask_user_pending", None)
+                                session.active_task.execution_state.ask_user_pending = None
                                 print(f"[DEBUG] 设置用户答案到 {output_key}: {user_answer}，清除ask_user_pending状态")
                             else:
                                 # 如果ask_user_pending不存在，尝试从pending_ask中推断
-                                if session.pending_ask and hasattr(session.pending_ask, 'expects'):
+                                if session.pending_ask:
                                     # 根据问题类型推断output_key
-                                    question = session.pending_ask.question.lower()
-                                    if "城市" in question or "city" in question:
-                                        output_key = "user_location"
-                                    elif "日期" in question or "时间" in question or "date" in question or "time" in question:
-                                        output_key = "user_date"
-                                    else:
-                                        output_key = "user_answer"
-
-                                    session.active_task.execution_state.set_artifact(output_key, user_answer)
+                                    output_key = session.active_task.execution_state.set_answer_for_question(
+                                        session.pending_ask.question, user_answer
+                                    )
                                     print(f"[DEBUG] 从问题推断output_key: {output_key} = {user_answer}")
                                 else:
                                     # 默认设置到user_answer
@@ -657,7 +693,7 @@ class AgentCore:
                 # 从execution_state中获取ask_user_pending，提取正确的ask_id
                 ask_user_pending = None
                 if result.execution_state:
-                    ask_user_pending = result.execution_state.get_artifact("ask_user_pending")
+                    ask_user_pending = result.execution_state.ask_user_pending
 
                 if ask_user_pending and isinstance(ask_user_pending, dict):
                     ask_id = ask_user_pending.get("ask_id", f"ask_{int(asyncio.get_event_loop().time())}")
@@ -830,7 +866,7 @@ class AgentCore:
 
             # 检查是否处于ask_user状态
             if orchestrator_result.status == "ask_user" and orchestrator_result.execution_state:
-                ask_user_data = orchestrator_result.execution_state.get_artifact("ask_user_pending")
+                ask_user_data = orchestrator_result.execution_state.ask_user_pending
                 if ask_user_data:
                     response = f"🤔 {ask_user_data['question']}\n\n请告诉我您的答案，我将继续为您处理请求。"
                     metadata = {
@@ -905,35 +941,7 @@ class AgentCore:
         Returns:
             系统提示词
         """
-        base_prompt = """你是AI个人助理，可以帮助用户处理各种任务。
-
-你具备以下能力：
-1. 基础对话和问答
-2. 工具调用能力 - 你可以调用工具来获取外部信息"""
-
-        if self.tools:
-            tool_names = [tool.name for tool in self.tools]
-            base_prompt += f"\n3. 可用工具: {', '.join(tool_names)}"
-
-        base_prompt += """
-
-INSTRUCTIONS:
-You are a helpful AI assistant with access to tools. When a user asks a question that requires external information, you MUST call the appropriate tool.
-
-TOOL USAGE RULES:
-- For time-related questions (current time, day of week, date): Call time_now
-- For weather queries: Call weather_get
-- For math calculations: Call math_calc
-- For calendar/schedule queries: Call calendar_read
-- For email queries: Call email_list
-- For web searches: Call web_search
-- For file reading: Call file_read
-- For file writing: Call file_write (supports path aliases like "桌面", "下载", "文档")
-- For asking user information (location, date, etc.): Call ask_user
-
-IMPORTANT: Always call the appropriate tool when external information is needed. Do not provide generic responses."""
-
-        return base_prompt
+        return _render_system_prompt(tuple(tool.name for tool in self.tools))
 
     def _build_prompt(self, user_input: str, context: Optional[Dict[str, Any]] = None) -> str:
         """
@@ -58,6 +58,8 @@ class Config:
         self.max_plan_iters = int(os.getenv("MAX_PLAN_ITERS", "2"))
         self.max_latency_ms = int(os.getenv("MAX_LATENCY_MS", "60000"))
         self.max_tokens_per_stage = int(os.getenv("MAX_TOKENS_PER_STAGE", "4000"))
+        # 规划缓存容量（相同查询复用已验证的计划，0表示关闭）
+        self.planner_cache_size = int(os.getenv("PLANNER_CACHE_SIZE", "64"))
 
     def validate(self, require_api_keys=True):
         """验证配置
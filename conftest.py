@@ -0,0 +1,41 @@
+"""
+pytest共享fixtures
+配置、LLM接口等构造开销较大的对象在整个测试会话中只创建一次
+"""
+import inspect
+
+import pytest
+
+from config import get_config
+
+
+@pytest.fixture(scope="session")
+def anyio_backend():
+    """异步测试统一使用asyncio后端，整个会话共用一个事件循环"""
+    return "asyncio"
+
+
+@pytest.fixture(scope="session", autouse=True)
+async def _session_event_loop(anyio_backend):
+    """会话期间持有anyio测试运行器，所有异步测试复用同一个事件循环，而不是每个测试新建一次"""
+    yield
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_pycollect_makeitem(collector, name, obj):
+    """为协程测试函数自动加上anyio标记，交给anyio插件在共享事件循环中运行"""
+    if inspect.iscoroutinefunction(obj) and collector.istestfunction(obj, name):
+        pytest.mark.anyio(obj)
+
+
+@pytest.fixture(scope="session")
+def config():
+    """全局配置"""
+    return get_config()
+
+
+@pytest.fixture(scope="session")
+def llm(config):
+    """LLM接口（不校验密钥，未配置密钥时提供者为空）"""
+    from llm_interface import LLMInterface
+    return LLMInterface(validate_keys=False)
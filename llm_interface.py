@@ -71,7 +71,7 @@ class GeminiProvider(LLMProvider):
         force_json: bool = False,
         **kwargs
     ) -> LLMResponse:
-        start_time = time.time()
+        start_time = time.monotonic()
 
         try:
             # 配置生成参数
@@ -114,7 +114,7 @@ class GeminiProvider(LLMProvider):
                     })
 
             # 计算响应时间
-            response_time = time.time() - start_time
+            response_time = time.monotonic() - start_time
 
             # 构建使用情况（Gemini没有直接的token计数）
             usage = {"estimated_tokens": len(content.split()) * 1.3}  # 粗略估计
@@ -152,7 +152,7 @@ class DeepSeekProvider(LLMProvider):
         force_json: bool = False,
         **kwargs
     ) -> LLMResponse:
-        start_time = time.time()
+        start_time = time.monotonic()
 
         try:
             # 构建消息
@@ -209,7 +209,7 @@ class DeepSeekProvider(LLMProvider):
                         })
 
             # 计算响应时间
-            response_time = time.time() - start_time
+            response_time = time.monotonic() - start_time
 
             # 获取使用情况
             usage = {
@@ -251,7 +251,7 @@ class DeepSeekProvider(LLMProvider):
         Yields:
             Dict[str, Any]: 流式数据块
         """
-        start_time = time.time()
+        start_time = time.monotonic()
 
         try:
             # 构建消息
@@ -291,12 +291,13 @@ class DeepSeekProvider(LLMProvider):
             function_calls_buffer = []
 
             async for chunk in stream:
-                if chunk.choices and chunk.choices[0].delta:
-                    delta = chunk.choices[0].delta
-
+                # 每个token只取一次delta及其字段（这是流式输出的逐token热路径）
+                choices = chunk.choices
+                delta = choices[0].delta if choices else None
+                if delta:
                     # 处理增量内容
-                    if hasattr(delta, 'content') and delta.content:
-                        delta_content = delta.content
+                    delta_content = getattr(delta, 'content', None)
+                    if delta_content:
                         content_buffer += delta_content
 
                         # yield增量内容
@@ -307,8 +308,9 @@ class DeepSeekProvider(LLMProvider):
                         }
 
                     # 处理工具调用（简化处理）
-                    if hasattr(delta, 'tool_calls') and delta.tool_calls:
-                        for tool_call_delta in delta.tool_calls:
+                    tool_calls = getattr(delta, 'tool_calls', None)
+                    if tool_calls:
+                        for tool_call_delta in tool_calls:
                             if hasattr(tool_call_delta, 'function') and tool_call_delta.function:
                                 # 累积工具调用信息
                                 if len(function_calls_buffer) <= tool_call_delta.index:
@@ -325,7 +327,7 @@ class DeepSeekProvider(LLMProvider):
                                                             tool_call_delta.function.arguments)
 
             # 计算响应时间
-            response_time = time.time() - start_time
+            response_time = time.monotonic() - start_time
 
             # 获取使用情况（流式模式下可能没有完整的使用信息）
             usage = {}
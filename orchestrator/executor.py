@@ -4,15 +4,18 @@ Executor模块 - 负责执行计划中的步骤
 """
 import asyncio
 import json
-from typing import Dict, Any, List, Optional, Union, Set
+import secrets
+from typing import Dict, Any, List, Optional, Union, Set, Tuple
 from datetime import datetime
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr
 
 from llm_interface import create_llm_interface_with_keys
 from schemas.orchestrator import PlannerOutput, PlanStep, StepType, Plan
+from schemas.step_graph import topological_order
 from tool_registry import get_tools, execute_tool, ToolError
 from schemas.tool_result import StandardToolResult
 from utils.telemetry import get_telemetry_logger, TelemetryStage, TelemetryEvent
+from utils.json_codec import dumps as json_dumps
 from logger import get_logger
 
 logger = get_logger()
@@ -20,6 +23,18 @@ logger = get_logger()
 
 # AskUserException已移除，现在通过ask_user工具处理
 
+# 用户答案的期望类型 -> 写入的产出键（按顺序匹配，均未命中时写入 user_answer）
+_EXPECTS_TO_OUTPUT_KEY: Dict[str, str] = {
+    "city": "user_city",
+    "date": "user_date",
+}
+
+# 问题关键词 -> 写入的产出键（按顺序匹配，均未命中时写入 user_answer）
+_QUESTION_KEYWORDS_TO_OUTPUT_KEY = (
+    (("城市", "city"), "user_location"),
+    (("日期", "时间", "date", "time"), "user_date"),
+)
+
 
 class ExecutionState(BaseModel):
     """执行状态管理 - 使用Pydantic统一序列化"""
@@ -41,10 +56,90 @@ class ExecutionState(BaseModel):
     completed_steps: List[str] = Field(default_factory=list, description="已完成的步骤ID（遗留）")
     asked_questions: List[str] = Field(default_factory=list, description="已问过的问题（遗留）")
 
+    # 自上次持久化以来修改过的字段名及产出键（供增量保存使用，不参与序列化）
+    # set_artifact只记录产出键，补丁里只写改动的产出项；artifacts整体赋值时才记为整字段修改
+    _dirty: Set[str] = PrivateAttr(default_factory=set)
+    _dirty_artifacts: Set[str] = PrivateAttr(default_factory=set)
+
+    def model_post_init(self, __context: Any) -> None:
+        """新建的状态尚未持久化，所有字段都视为已修改"""
+        self._dirty = set(type(self).model_fields)
+
+    def __setattr__(self, name: str, value: Any):
+        """字段整体赋值时自动标记为已修改"""
+        super().__setattr__(name, value)
+        if name in type(self).model_fields:
+            self._dirty.add(name)
+
+    def mark_dirty(self, *names: str):
+        """标记原地修改过的容器字段（如 done_set.add / errors.append）"""
+        self._dirty.update(names)
+
+    def get_dirty(self) -> Tuple[Set[str], Set[str]]:
+        """返回已修改字段集合与已修改产出键集合的副本"""
+        return set(self._dirty), set(self._dirty_artifacts)
+
+    def clear_dirty(self, fields: Set[str], artifact_keys: Set[str]):
+        """持久化成功后清除已写入的修改标记"""
+        self._dirty.difference_update(fields)
+        self._dirty_artifacts.difference_update(artifact_keys)
+
     def set_artifact(self, key: str, value: Any):
         """设置步骤产出"""
         self.artifacts[key] = value
-        logger.debug(f"设置产出: {key} = {str(value)[:100]}...")
+        self._dirty_artifacts.add(key)
+        # 产出可能很大，仅在DEBUG级别实际输出时才格式化
+        logger.opt(lazy=True).debug("设置产出: {} = {}...", lambda: key, lambda: str(value)[:100])
+
+    @property
+    def ask_user_pending(self) -> Optional[Dict[str, Any]]:
+        """挂起的ask_user信息（仍存放在artifacts中，随状态一起持久化）"""
+        return self.artifacts.get("ask_user_pending")
+
+    @ask_user_pending.setter
+    def ask_user_pending(self, value: Optional[Dict[str, Any]]):
+        self.set_artifact("ask_user_pending", value)
+
+    def set_user_answer(self, expects: str, answer: Any) -> str:
+        """
+        按期望的答案类型把用户答案写入产出
+
+        Args:
+            expects: 期望的答案类型（如 "city"、"date"、"city|date"）
+            answer: 用户答案
+
+        Returns:
+            str: 写入的产出键
+        """
+        expects = expects.lower()
+        output_key = _EXPECTS_TO_OUTPUT_KEY.get(expects)
+        if output_key is None:
+            output_key = next(
+                (key for expect, key in _EXPECTS_TO_OUTPUT_KEY.items() if expect in expects),
+                "user_answer"
+            )
+        self.set_artifact(output_key, answer)
+        return output_key
+
+    def set_answer_for_question(self, question: str, answer: Any) -> str:
+        """
+        按问题内容推断产出键并写入用户答案（缺少ask_user_pending时使用）
+
+        Args:
+            question: 向用户提出的问题
+            answer: 用户答案
+
+        Returns:
+            str: 写入的产出键
+        """
+        question = question.lower()
+        output_key = next(
+            (key for keywords, key in _QUESTION_KEYWORDS_TO_OUTPUT_KEY
+             if any(keyword in question for keyword in keywords)),
+            "user_answer"
+        )
+        self.set_artifact(output_key, answer)
+        return output_key
 
     def get_artifact(self, key: str) -> Any:
         """获取步骤产出"""
@@ -144,15 +239,19 @@ class Executor:
         state = ExecutionState()
         if user_inputs:
             state.inputs.update(user_inputs)
+            state.mark_dirty("inputs")
 
         logger.info(f"开始执行计划，共 {len(plan.steps)} 个步骤")
 
         # 初始化工具调用计数
         tool_call_count = 0
 
+        # 按依赖关系的拓扑顺序执行（复用计划校验时计算的顺序），cursor_index指向该顺序中的位置
+        ordered_steps = self._topological_sort(plan)
+
         # 使用cursor_index作为执行指针
-        while state.cursor_index < len(plan.steps):
-            current_step = plan.steps[state.cursor_index]
+        while state.cursor_index < len(ordered_steps):
+            current_step = ordered_steps[state.cursor_index]
 
             # 检查步骤是否已经完成（使用step_id）
             if current_step.step_id in state.done_set:
@@ -173,12 +272,14 @@ class Executor:
                 tool_call_count += step_tool_calls
 
                 # 如果产生了ask_user_pending，立即返回（不标记为完成）
-                if state.get_artifact("ask_user_pending"):
+                ask_user_pending = state.ask_user_pending
+                if ask_user_pending:
                     logger.info(f"步骤 {current_step.id} 产生ask_user_pending，暂停执行等待用户输入")
                     # 记录ask_id映射
-                    ask_id = state.get_artifact("ask_user_pending").get("ask_id", "")
+                    ask_id = ask_user_pending.get("ask_id", "")
                     if ask_id:
                         state.asked_map[current_step.step_id] = ask_id
+                        state.mark_dirty("asked_map")
 
                     # 立即持久化状态（包含pending_ask信息）
                     from session_manager import session_manager
@@ -190,6 +291,7 @@ class Executor:
                 # 步骤执行成功，标记为完成并前进指针
                 state.done_set.add(current_step.step_id)
                 state.completed_steps.append(current_step.id)  # 保持遗留兼容性
+                state.mark_dirty("done_set", "completed_steps")
                 state.cursor_index += 1
                 logger.info(f"步骤 {current_step.id} 执行完成，指针前进到: {state.cursor_index}")
 
@@ -203,6 +305,7 @@ class Executor:
                 error_msg = f"步骤 {current_step.id} 执行失败: {str(e)}"
                 logger.error(error_msg)
                 state.errors.append(error_msg)
+                state.mark_dirty("errors")
                 state.cursor_index += 1  # 出错也前进指针，避免死循环
 
                 # 如果是关键步骤失败，可能需要停止执行
@@ -253,11 +356,11 @@ class Executor:
         if step.tool == "weather_get":
             location_value = mapped_inputs.get("location")
             if not isinstance(location_value, str) or not location_value.strip():
-                state.set_artifact("ask_user_pending", {
+                state.ask_user_pending = {
                     "questions": ["请告诉我要查询天气的城市（例如：Rotterdam, NL）"],
                     "expects": "city",
                     "step_id": step.id
-                })
+                }
                 logger.info("weather_get缺少location，已触发ASK_USER等待城市信息")
                 return
 
@@ -511,12 +614,12 @@ class Executor:
         """执行询问用户步骤 - 发问即返回，下一条续跑"""
         question = inputs.get("question", "请提供更多信息")
 
-        # 生成ask_id
-        import uuid
-        ask_id = f"ask_{int(asyncio.get_event_loop().time())}_{uuid.uuid4().hex[:8]}"
+        # 生成ask_id（8位随机十六进制后缀）
+        ask_id = f"ask_{int(asyncio.get_event_loop().time())}_{secrets.token_hex(4)}"
 
         # 记录ask_id映射
         state.asked_map[step.step_id] = ask_id
+        state.mark_dirty("asked_map")
 
         # 设置ask_user_pending状态（包含ask_id）
         ask_user_pending = {
@@ -528,7 +631,7 @@ class Executor:
             "questions": [question]  # 确保questions字段存在
         }
 
-        state.set_artifact("ask_user_pending", ask_user_pending)
+        state.ask_user_pending = ask_user_pending
         logger.info(f"[DEBUG] Executor设置ask_user_pending状态: ask_id={ask_id}, step_id={step.step_id}, output_key={step.output_key}")
         logger.info(f"设置ask_user_pending状态，ask_id: {ask_id}, 问题: {question}")
         logger.info(f"[DEBUG] ask_user_pending完整内容: {ask_user_pending}")
@@ -560,7 +663,7 @@ class Executor:
         # 添加输入数据
         for key, value in inputs.items():
             if isinstance(value, dict):
-                process_prompt += f"{key}: {json.dumps(value, ensure_ascii=False, indent=2)}\n\n"
+                process_prompt += f"{key}: {json_dumps(value, indent=True).decode()}\n\n"
             else:
                 process_prompt += f"{key}: {value}\n\n"
 
@@ -605,35 +708,16 @@ class Executor:
         logger.info(f"输出步骤完成: {len(output_data)} 个数据项")
 
 
-    def _topological_sort(self, steps: List[PlanStep]) -> List[PlanStep]:
-        """拓扑排序步骤（处理依赖关系）"""
-        # 简单的依赖关系排序（可以优化为真正的拓扑排序）
-        sorted_steps = []
-        remaining = steps.copy()
-
-        while remaining:
-            # 找到没有未满足依赖的步骤
-            executable = []
-            for step in remaining:
-                deps_satisfied = all(dep in [s.id for s in sorted_steps] for dep in step.depends_on)
-                if deps_satisfied:
-                    executable.append(step)
-
-            if not executable:
-                # 有循环依赖或无法执行的步骤
-                logger.warning("检测到无法执行的步骤，跳过依赖检查")
-                sorted_steps.extend(remaining)
-                break
-
-            # 按ID排序执行
-            executable.sort(key=lambda s: s.id)
-            sorted_steps.extend(executable)
-
-            # 从剩余列表中移除已执行的步骤
-            for step in executable:
-                remaining.remove(step)
+    def _topological_sort(self, plan: PlannerOutput) -> List[PlanStep]:
+        """拓扑排序步骤（优先复用计划校验时计算的执行顺序）"""
+        steps = plan.steps
+        step_by_id = {step.id: step for step in steps}
+        order = getattr(plan, "_topo_order", None) or []
+        if len(order) == len(steps) and all(step_id in step_by_id for step_id in order):
+            return [step_by_id[step_id] for step_id in order]
 
-        return sorted_steps
+        # 未经校验构造或校验后被改动的计划：按当前步骤列表重新计算（依赖缺失时抛出ValueError）
+        return [steps[i] for i in topological_order(steps)]
 
     async def execute_single_step(self, step: PlanStep, state: ExecutionState) -> Dict[str, Any]:
         """执行单个步骤（用于调试）"""
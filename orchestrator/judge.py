@@ -2,7 +2,6 @@
 Judge模块 - 负责判断执行结果并决定下一步
 使用DeepSeek-R1 (deepseek-reasoner) 进行推理判断
 """
-import json
 import asyncio
 from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime
@@ -11,6 +10,7 @@ from llm_interface import create_llm_interface_with_keys
 from schemas.orchestrator import PlannerOutput, JudgeOutput, validate_judge_output, Plan
 from orchestrator.executor import ExecutionState
 from config import get_config
+from utils.json_codec import dumps as json_dumps
 from telemetry import get_telemetry_logger, TelemetryStage, TelemetryEvent
 from logger import get_logger
 
@@ -177,7 +177,7 @@ class Judge:
 
         for key, value in state.artifacts.items():
             if isinstance(value, (dict, list)):
-                value_str = json.dumps(value, ensure_ascii=False, indent=2)
+                value_str = json_dumps(value, indent=True).decode()
             else:
                 value_str = str(value)
             prompt_parts.append(f"- {key}: {value_str[:200]}{'...' if len(value_str) > 200 else ''}")
@@ -4,7 +4,9 @@ Orchestrator主模块 - 实现PLAN→ACT→JUDGE状态机
 """
 import asyncio
 import time
-from typing import Dict, Any, Optional, List
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Dict, Any, Optional, List, Set, Deque, Iterable, Tuple
 from enum import Enum
 from datetime import datetime
 
@@ -13,14 +15,21 @@ from .planner import get_planner
 from .executor import get_executor, ExecutionState
 from .judge import get_judge
 from config import get_config
+from utils.json_codec import dumps as json_dumps
 from telemetry import get_telemetry_logger, TelemetryStage, TelemetryEvent
 from .post_mortem_logger import get_post_mortem_logger
 from logger import get_logger
 from typing import Dict as TypingDict
-import uuid
+from utils.ids import fast_uuid4
 
 logger = get_logger()
 
+# 每个会话保留的对话消息上限
+_MAX_HISTORY = 50
+
+# 对话上下文摘要包含的最近消息数
+_CONTEXT_MESSAGES = 5
+
 
 class ActiveTask:
     """活动任务状态"""
@@ -42,13 +51,13 @@ class ActiveTask:
         self.last_activity = time.time()
 
 
+@dataclass(slots=True)
 class PendingAsk:
     """挂起的问题状态"""
-    def __init__(self, ask_id: str, question: str, expects: str):
-        self.ask_id = ask_id
-        self.question = question
-        self.expects = expects  # 期望的答案类型，如 "city|date|..."
-        self.ts = time.time()
+    ask_id: str = ""
+    question: str = ""
+    expects: str = ""  # 期望的答案类型，如 "city|date|..."
+    ts: float = field(default_factory=time.time)
 
     def to_dict(self) -> Dict[str, Any]:
         return {
@@ -59,6 +68,33 @@ class PendingAsk:
         }
 
 
+@dataclass(slots=True)
+class UserPreferences:
+    """用户偏好（常用项为固定字段，其余键存入extra）"""
+    default_city: Optional[str] = None
+    temperature_unit: Optional[str] = None
+    language: Optional[str] = None
+    extra: Dict[str, Any] = field(default_factory=dict)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """按键名读取偏好，未设置时返回default"""
+        if key in _PREFERENCE_FIELDS:
+            value = getattr(self, key)
+            return default if value is None else value
+        return self.extra.get(key, default)
+
+    def set(self, key: str, value: Any):
+        """按键名设置偏好"""
+        if key in _PREFERENCE_FIELDS:
+            setattr(self, key, value)
+        else:
+            self.extra[key] = value
+
+
+# UserPreferences的固定字段名
+_PREFERENCE_FIELDS = frozenset(("default_city", "temperature_unit", "language"))
+
+
 class ConversationMessage:
     """对话消息"""
     def __init__(self, role: str, content: str, timestamp: float = None):
@@ -73,16 +109,48 @@ class ConversationMessage:
             "timestamp": self.timestamp
         }
 
+    def render_preview(self) -> str:
+        """渲染为上下文摘要中的一行（内容截取前100个字符）"""
+        role_name = "用户" if self.role == "user" else "助手"
+        content_preview = self.content[:100] + "..." if len(self.content) > 100 else self.content
+        return f"{role_name}: {content_preview}"
+
 
 class SessionState:
     """会话状态"""
     def __init__(self):
-        self.active_task: Optional[ActiveTask] = None
-        self.pending_ask: Optional[PendingAsk] = None
-        self.session_id: str = str(uuid.uuid4())
+        self._active_task: Optional[ActiveTask] = None
+        self._pending_ask: Optional[PendingAsk] = None
+        self.session_id: str = fast_uuid4()
         self.created_at: float = time.time()
-        self.conversation_history: List[ConversationMessage] = []  # 对话历史
-        self.user_preferences: Dict[str, Any] = {}  # 用户偏好信息
+        self.conversation_history: Deque[ConversationMessage] = deque(maxlen=_MAX_HISTORY)  # 对话历史（超出上限自动丢弃最旧消息）
+        self._rendered_tail: Deque[str] = deque(maxlen=_CONTEXT_MESSAGES)  # 最近消息的预渲染摘要行
+        self.user_preferences: UserPreferences = UserPreferences()  # 用户偏好信息
+
+    @property
+    def active_task(self) -> Optional[ActiveTask]:
+        return self._active_task
+
+    @active_task.setter
+    def active_task(self, task: Optional[ActiveTask]):
+        self._active_task = task
+        self._update_active_index()
+
+    @property
+    def pending_ask(self) -> Optional[PendingAsk]:
+        return self._pending_ask
+
+    @pending_ask.setter
+    def pending_ask(self, ask: Optional[PendingAsk]):
+        self._pending_ask = ask
+        self._update_active_index()
+
+    def _update_active_index(self):
+        """有活跃任务或挂起问题的会话登记到 _active_sessions，两者都清空时移除"""
+        if self._active_task is not None or self._pending_ask is not None:
+            _active_sessions.add(self.session_id)
+        else:
+            _active_sessions.discard(self.session_id)
 
     def has_pending_ask(self) -> bool:
         """检查是否有挂起的问题"""
@@ -92,17 +160,22 @@ class SessionState:
         """添加对话消息到历史"""
         message = ConversationMessage(role, content)
         self.conversation_history.append(message)
-        # 保持历史记录在合理的长度内
-        if len(self.conversation_history) > 50:
-            self.conversation_history = self.conversation_history[-50:]
+        self._rendered_tail.append(message.render_preview())
+
+    def extend_messages(self, pairs: Iterable[Tuple[str, str]]):
+        """批量添加对话消息（共用同一时间戳）"""
+        now = time.time()
+        messages = [ConversationMessage(role, content, now) for role, content in pairs]
+        self.conversation_history.extend(messages)
+        self._rendered_tail.extend(message.render_preview() for message in messages[-_CONTEXT_MESSAGES:])
 
     def get_recent_messages(self, limit: int = 10) -> List[ConversationMessage]:
         """获取最近的对话消息"""
-        return self.conversation_history[-limit:] if self.conversation_history else []
+        return list(self.conversation_history)[-limit:] if self.conversation_history else []
 
     def set_user_preference(self, key: str, value: Any):
         """设置用户偏好"""
-        self.user_preferences[key] = value
+        self.user_preferences.set(key, value)
 
     def get_user_preference(self, key: str, default: Any = None) -> Any:
         """获取用户偏好"""
@@ -113,16 +186,8 @@ class SessionState:
         if not self.conversation_history:
             return "新对话开始"
 
-        recent_messages = self.get_recent_messages(5)
-        context_parts = []
-
-        for msg in recent_messages:
-            role_name = "用户" if msg.role == "user" else "助手"
-            # 截取消息内容的前100个字符
-            content_preview = msg.content[:100] + "..." if len(msg.content) > 100 else msg.content
-            context_parts.append(f"{role_name}: {content_preview}")
-
-        return "\n".join(context_parts)
+        # 摘要行在添加消息时已渲染好
+        return "\n".join(self._rendered_tail)
 
     def set_pending_ask(self, question: str, expects_or_ask_id: str):
         """设置挂起的问题"""
@@ -132,7 +197,7 @@ class SessionState:
             expects = "answer"
         else:
             # 否则生成新的ask_id
-            ask_id = str(uuid.uuid4())
+            ask_id = fast_uuid4()
             expects = expects_or_ask_id
 
         self.pending_ask = PendingAsk(ask_id, question, expects)
@@ -161,6 +226,9 @@ class SessionState:
 # 全局会话存储
 _sessions: TypingDict[str, SessionState] = {}
 
+# 有活跃任务或挂起问题的会话ID（由SessionState维护，避免扫描全部会话）
+_active_sessions: Set[str] = set()
+
 
 def get_session(session_id: str) -> SessionState:
     """获取或创建会话"""
@@ -180,6 +248,7 @@ def cleanup_old_sessions():
     ]
     for sid in expired_sessions:
         del _sessions[sid]
+        _active_sessions.discard(sid)
         logger.info(f"清理过期会话: {sid}")
 
 
@@ -355,12 +424,7 @@ class Orchestrator:
             session.active_task.execution_state = ExecutionState()
 
         # 根据期望的答案类型设置参数
-        if "city" in pending_ask.expects.lower():
-            session.active_task.execution_state.set_artifact("user_city", user_answer)
-        elif "date" in pending_ask.expects.lower():
-            session.active_task.execution_state.set_artifact("user_date", user_answer)
-        else:
-            session.active_task.execution_state.set_artifact("user_answer", user_answer)
+        session.active_task.execution_state.set_user_answer(pending_ask.expects, user_answer)
 
         # 强制重新规划
         return self._force_replan(session.active_task)
@@ -461,7 +525,7 @@ class Orchestrator:
             # 检查是否已经有完整的execution_state可以直接继续执行
             if result.execution_state and result.final_plan:
                 # 检查是否所有必要的用户输入都已提供
-                has_pending_ask = result.execution_state.get_artifact("ask_user_pending")
+                has_pending_ask = result.execution_state.ask_user_pending
                 if not has_pending_ask:
                     # 没有待处理的ask_user，可以直接从ACT阶段开始
                     current_state = OrchestratorState.ACT
@@ -556,7 +620,7 @@ class Orchestrator:
 
                     # 从execution_state中提取pending_questions
                     if result.execution_state:
-                        ask_user_pending = result.execution_state.get_artifact("ask_user_pending")
+                        ask_user_pending = result.execution_state.ask_user_pending
                         if ask_user_pending and isinstance(ask_user_pending, dict):
                             questions = ask_user_pending.get("questions", [])
                             if questions:
@@ -778,7 +842,7 @@ class Orchestrator:
             logger.info(f"执行完成: {len(execution_state.completed_steps)}/{len(plan.steps)} 步骤成功")
 
             # 检查是否有等待用户输入的步骤（通过ask_user工具）
-            ask_user_pending = execution_state.get_artifact("ask_user_pending")
+            ask_user_pending = execution_state.ask_user_pending
             if ask_user_pending:
                 result.pending_questions = ask_user_pending.get("questions", [])
                 logger.info(f"执行阶段暂停，等待用户回答问题")
@@ -836,8 +900,7 @@ class Orchestrator:
                 if placeholder in template:
                     if isinstance(value, (dict, list)):
                         # 对于复杂对象，使用格式化的字符串
-                        import json
-                        value_str = json.dumps(value, ensure_ascii=False, indent=2)
+                        value_str = json_dumps(value, indent=True).decode()
                     else:
                         value_str = str(value)
                     template = template.replace(placeholder, value_str)
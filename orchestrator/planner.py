@@ -4,6 +4,8 @@ Planner模块 - 负责规划和制定执行计划
 """
 import json
 import asyncio
+import hashlib
+from collections import OrderedDict
 from typing import Dict, Any, List, Optional
 from datetime import datetime
 
@@ -39,6 +41,16 @@ class Planner:
         self.temperature = config.planner_temperature
         self.telemetry = get_telemetry_logger()
 
+        # 已验证计划的LRU缓存：提示词只依赖查询文本，相同查询无需再次调用规划模型
+        self._plan_cache_size = config.planner_cache_size
+        self._plan_cache: "OrderedDict[str, PlannerOutput]" = OrderedDict()
+
+    def _plan_cache_key(self, user_query: str) -> str:
+        """计算规划缓存键（规划模型 + 归一化后的查询文本）"""
+        normalized = " ".join(user_query.split())
+        raw = f"{self.llm.config.deepseek_model}\x00{normalized}".encode("utf-8")
+        return hashlib.blake2b(raw, digest_size=16).hexdigest()
+
     async def create_plan(self, user_query: str, context: Dict[str, Any] = None) -> PlannerOutput:
         """
         为用户查询创建执行计划
@@ -59,6 +71,13 @@ class Planner:
         # 构建用户提示词
         user_prompt = self._build_user_prompt(user_query, context)
 
+        cache_key = self._plan_cache_key(user_query)
+        cached_plan = self._plan_cache.get(cache_key)
+        if cached_plan is not None:
+            self._plan_cache.move_to_end(cache_key)
+            logger.info(f"✅ 命中规划缓存，共 {len(cached_plan.steps)} 个步骤")
+            return cached_plan.model_copy(deep=True)
+
         logger.info(f"开始规划用户查询: {user_query[:100]}...")
 
         for attempt in range(self.max_retries + 1):
@@ -79,12 +98,14 @@ class Planner:
                 # 解析和验证计划（严格JSON模式）
                 validated_plan = validate_planner_output(response.content)
 
-                # 为每个step计算稳定ID
+                # 为每个step计算稳定ID（模型不可变，生成带ID的步骤副本和计划副本）
                 from schemas.plan import compute_step_id
+                steps_with_ids = []
                 for step in validated_plan.steps:
-                    step_dict = step.dict()
-                    step.step_id = compute_step_id(step_dict)
-                    logger.debug(f"步骤 {step.id} 的稳定ID: {step.step_id}")
+                    step_id = compute_step_id(step.model_dump())
+                    steps_with_ids.append(step.model_copy(update={"step_id": step_id}))
+                    logger.debug(f"步骤 {step.id} 的稳定ID: {step_id}")
+                validated_plan = validated_plan.model_copy(update={"steps": steps_with_ids})
 
                 # 检查规划质量
                 if len(validated_plan.steps) == 0:
@@ -97,6 +118,10 @@ class Planner:
                         plan_excerpt={"goal": validated_plan.goal, "steps_count": 0},
                         model={"planner": self.llm.config.deepseek_model}
                     )
+                elif self._plan_cache_size > 0:
+                    self._plan_cache[cache_key] = validated_plan.model_copy(deep=True)
+                    if len(self._plan_cache) > self._plan_cache_size:
+                        self._plan_cache.popitem(last=False)
 
                 logger.info(f"✅ 规划成功，共 {len(validated_plan.steps)} 个步骤")
                 return validated_plan
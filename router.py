@@ -2,6 +2,9 @@
 智能路由器 - 区分chat vs orchestrate模式
 """
 import re
+from dataclasses import dataclass
+from functools import lru_cache
+from types import MappingProxyType
 from typing import Dict, Any, Tuple
 from enum import Enum
 import logging
@@ -21,115 +24,156 @@ class RouteMode(Enum):
     ORCHESTRATE = "orchestrate"
 
 
+@dataclass(slots=True)
+class _QueryCtx:
+    """单次路由的查询上下文（小写形式和长度只计算一次）"""
+    raw: str
+    lower: str
+    length: int
+    is_ascii: bool
+
+
+# 路由关键词表（模块级共享，所有QueryRouter实例复用同一份数据）
+# 强制模式前缀
+_FORCE_CHAT_PREFIXES = ("/chat", "!chat", "chat:")
+_FORCE_ORCHESTRATE_PREFIXES = ("/plan", "/orchestrate", "!plan", "!orchestrate", "plan:")
+
+# 强制模式前缀 -> (模式, 原因说明)，导入时一次性生成
+_FORCE_MODE_REASONS = MappingProxyType({
+    **{prefix: (RouteMode.CHAT, f"用户强制指定chat模式: {prefix}") for prefix in _FORCE_CHAT_PREFIXES},
+    **{prefix: (RouteMode.ORCHESTRATE, f"用户强制指定orchestrate模式: {prefix}")
+       for prefix in _FORCE_ORCHESTRATE_PREFIXES},
+})
+
+# Orchestrate关键词（需要复杂编排的场景）
+_ORCHESTRATE_KEYWORDS = (
+    # 时间相关
+    "明天", "今天", "昨天", "日期", "时间", "几点", "什么时候",
+    "date", "time", "tomorrow", "today", "yesterday", "when",
+
+    # 文件操作
+    "写", "保存", "创建", "写入", "导出", "保存到", "写到",
+    "write", "save", "create", "export", "save to",
+
+    # 工具调用
+    "搜索", "查询", "查找", "计算", "计算器", "天气", "地图",
+    "search", "query", "find", "calculate", "weather", "map",
+
+    # RAG相关
+    "文档", "知识库", "资料", "文件", "笔记",
+    "document", "knowledge", "file", "note",
+
+    # 复杂任务
+    "规划", "计划", "安排", "组织", "整理",
+    "plan", "schedule", "organize", "arrange",
+
+    # 邮件相关
+    "邮件", "邮箱", "发邮件", "收邮件",
+    "email", "mail", "send", "receive",
+
+    # 日历相关
+    "日历", "日程", "会议", "提醒",
+    "calendar", "schedule", "meeting", "reminder",
+
+    # 网络操作
+    "网页", "网站", "抓取", "爬取",
+    "web", "website", "scrape", "crawl",
+
+    # 数据处理
+    "分析", "统计", "汇总", "报告",
+    "analyze", "statistics", "summary", "report",
+
+    # 多步骤任务
+    "先", "然后", "接着", "最后", "步骤",
+    "first", "then", "next", "finally", "step"
+)
+
+# Chat关键词（简单对话场景）
+_CHAT_KEYWORDS = (
+    # 问候
+    "你好", "您好", "hello", "hi", "hey",
+
+    # 闲聊
+    "怎么样", "如何", "什么", "为什么", "怎么",
+    "how", "what", "why", "how",
+
+    # 个人问题
+    "你是谁", "你的名字", "介绍", "自我介绍",
+    "who are you", "your name", "introduce",
+
+    # 简单指令
+    "帮我", "请", "麻烦", "能否",
+    "help", "please", "can you",
+
+    # 情感表达
+    "谢谢", "感谢", "好的", "好的",
+    "thank", "thanks", "ok", "good"
+)
+
+# 纯ASCII查询只可能命中ASCII关键词，预先筛出子表供快速路径使用
+_ORCHESTRATE_KEYWORDS_ASCII = tuple(k for k in _ORCHESTRATE_KEYWORDS if k.isascii())
+_CHAT_KEYWORDS_ASCII = tuple(k for k in _CHAT_KEYWORDS if k.isascii())
+
+# 关键词编译为单个正则交替式，一次C层扫描即可判断是否存在任一关键词
+_ORCHESTRATE_RE = re.compile("|".join(map(re.escape, _ORCHESTRATE_KEYWORDS)))
+_CHAT_RE = re.compile("|".join(map(re.escape, _CHAT_KEYWORDS)))
+
+
+def _count_keywords(pattern: "re.Pattern[str]", keywords: Tuple[str, ...], text: str) -> int:
+    """统计命中的关键词个数（无任何命中时由正则直接短路）"""
+    if pattern.search(text) is None:
+        return 0
+    return sum(1 for keyword in keywords if keyword in text)
+
+
 class QueryRouter:
     """查询路由器"""
 
     def __init__(self):
         # 强制模式前缀
-        self.force_chat_prefixes = ["/chat", "!chat", "chat:"]
-        self.force_orchestrate_prefixes = ["/plan", "/orchestrate", "!plan", "!orchestrate", "plan:"]
-
-        # Orchestrate关键词（需要复杂编排的场景）
-        self.orchestrate_keywords = [
-            # 时间相关
-            "明天", "今天", "昨天", "日期", "时间", "几点", "什么时候",
-            "date", "time", "tomorrow", "today", "yesterday", "when",
-
-            # 文件操作
-            "写", "保存", "创建", "写入", "导出", "保存到", "写到",
-            "write", "save", "create", "export", "save to",
-
-            # 工具调用
-            "搜索", "查询", "查找", "计算", "计算器", "天气", "地图",
-            "search", "query", "find", "calculate", "weather", "map",
-
-            # RAG相关
-            "文档", "知识库", "资料", "文件", "笔记",
-            "document", "knowledge", "file", "note",
-
-            # 复杂任务
-            "规划", "计划", "安排", "组织", "整理",
-            "plan", "schedule", "organize", "arrange",
-
-            # 邮件相关
-            "邮件", "邮箱", "发邮件", "收邮件",
-            "email", "mail", "send", "receive",
-
-            # 日历相关
-            "日历", "日程", "会议", "提醒",
-            "calendar", "schedule", "meeting", "reminder",
-
-            # 网络操作
-            "网页", "网站", "抓取", "爬取",
-            "web", "website", "scrape", "crawl",
-
-            # 数据处理
-            "分析", "统计", "汇总", "报告",
-            "analyze", "statistics", "summary", "report",
-
-            # 多步骤任务
-            "先", "然后", "接着", "最后", "步骤",
-            "first", "then", "next", "finally", "step"
-        ]
-
-        # Chat关键词（简单对话场景）
-        self.chat_keywords = [
-            # 问候
-            "你好", "您好", "hello", "hi", "hey",
-
-            # 闲聊
-            "怎么样", "如何", "什么", "为什么", "怎么",
-            "how", "what", "why", "how",
-
-            # 个人问题
-            "你是谁", "你的名字", "介绍", "自我介绍",
-            "who are you", "your name", "introduce",
-
-            # 简单指令
-            "帮我", "请", "麻烦", "能否",
-            "help", "please", "can you",
-
-            # 情感表达
-            "谢谢", "感谢", "好的", "好的",
-            "thank", "thanks", "ok", "good"
-        ]
-
-    def _check_force_mode(self, query: str) -> Tuple[RouteMode, str]:
+        self.force_chat_prefixes = _FORCE_CHAT_PREFIXES
+        self.force_orchestrate_prefixes = _FORCE_ORCHESTRATE_PREFIXES
+
+        # 关键词表
+        self.orchestrate_keywords = _ORCHESTRATE_KEYWORDS
+        self.chat_keywords = _CHAT_KEYWORDS
+        self._orchestrate_keywords_ascii = _ORCHESTRATE_KEYWORDS_ASCII
+        self._chat_keywords_ascii = _CHAT_KEYWORDS_ASCII
+        self._orchestrate_re = _ORCHESTRATE_RE
+        self._chat_re = _CHAT_RE
+
+    def _check_force_mode(self, ctx: _QueryCtx) -> Tuple[RouteMode, str]:
         """检查是否强制指定模式"""
-        query_lower = query.lower().strip()
-
-        # 检查强制chat模式
-        for prefix in self.force_chat_prefixes:
-            if query_lower.startswith(prefix):
-                clean_query = query[len(prefix):].strip()
-                return RouteMode.CHAT, f"用户强制指定chat模式: {prefix}"
+        query = ctx.raw
+        query_lower = ctx.lower.strip()
 
-        # 检查强制orchestrate模式
-        for prefix in self.force_orchestrate_prefixes:
+        # 检查强制chat模式，再检查强制orchestrate模式（原因说明查预生成表）
+        for prefix in self.force_chat_prefixes + self.force_orchestrate_prefixes:
             if query_lower.startswith(prefix):
-                clean_query = query[len(prefix):].strip()
-                return RouteMode.ORCHESTRATE, f"用户强制指定orchestrate模式: {prefix}"
+                return _FORCE_MODE_REASONS[prefix]
 
         return None, query
 
-    def _heuristic_route(self, query: str) -> Tuple[RouteMode, str]:
+    def _heuristic_route(self, ctx: _QueryCtx) -> Tuple[RouteMode, str]:
         """启发式路由"""
-        query_lower = query.lower()
+        query_lower = ctx.lower
+
+        # 纯ASCII查询（如 "hi"、"1+1"）跳过不可能命中的中文关键词
+        if ctx.is_ascii:
+            orchestrate_keywords = self._orchestrate_keywords_ascii
+            chat_keywords = self._chat_keywords_ascii
+        else:
+            orchestrate_keywords = self.orchestrate_keywords
+            chat_keywords = self.chat_keywords
 
         # 计算orchestrate关键词匹配数
-        orchestrate_score = 0
-        for keyword in self.orchestrate_keywords:
-            if keyword in query_lower:
-                orchestrate_score += 1
+        orchestrate_score = _count_keywords(self._orchestrate_re, orchestrate_keywords, query_lower)
 
         # 计算chat关键词匹配数
-        chat_score = 0
-        for keyword in self.chat_keywords:
-            if keyword in query_lower:
-                chat_score += 1
+        chat_score = _count_keywords(self._chat_re, chat_keywords, query_lower)
 
         # 查询长度因素（长查询更可能是复杂任务）
-        query_length = len(query)
+        query_length = ctx.length
 
         # 决策逻辑
         if orchestrate_score > chat_score:
@@ -143,32 +187,34 @@ class QueryRouter:
         else:
             # 灰区：使用AI二分类
             try:
-                return self._advanced_route(query)
+                return self._advanced_route(ctx)
             except Exception as e:
                 logger.warning(f"AI二分类失败: {e}, 使用默认编排模式")
                 return RouteMode.ORCHESTRATE, f"灰区查询，默认使用编排模式(安全优先)"
 
-    def _advanced_route(self, query: str) -> Tuple[RouteMode, str]:
+    def _advanced_route(self, ctx: _QueryCtx) -> Tuple[RouteMode, str]:
         """高级路由（使用小模型二分类）
         对灰区查询使用轻量级模型进行二分类
         """
         # 暂时使用启发式，避免asyncio.run()在已有循环中的问题
         # TODO: 在合适的地方实现异步AI分类
         logger.info("使用启发式路由（AI二分类暂未实现）")
-        return self._heuristic_route(query)
+        return self._heuristic_route(ctx)
 
-    def route(self, query: str) -> Dict[str, Any]:
-        """路由主函数"""
+    def _route(self, query: str) -> Tuple[RouteMode, Dict[str, Any]]:
+        """路由并返回RouteMode枚举本身，供内部按身份比较"""
         if not query or not query.strip():
-            return {
+            return RouteMode.CHAT, {
                 "mode": RouteMode.CHAT.value,
                 "reason": "空查询，使用chat模式"
             }
 
+        ctx = _QueryCtx(query, query.lower(), len(query), query.isascii())
+
         # 1. 检查强制模式
-        force_mode, clean_query = self._check_force_mode(query)
+        force_mode, clean_query = self._check_force_mode(ctx)
         if force_mode:
-            return {
+            return force_mode, {
                 "mode": force_mode.value,
                 "reason": f"强制模式: {clean_query}",
                 "original_query": query,
@@ -178,34 +224,56 @@ class QueryRouter:
         # 2. 高级路由（可配置）
         use_advanced = False  # 可以从配置读取
         if use_advanced:
-            mode, reason = self._advanced_route(clean_query)
+            mode, reason = self._advanced_route(ctx)
         else:
-            mode, reason = self._heuristic_route(clean_query)
+            mode, reason = self._heuristic_route(ctx)
 
-        return {
+        return mode, {
             "mode": mode.value,
             "reason": reason,
             "original_query": query,
             "clean_query": clean_query
         }
 
+    def route(self, query: str) -> Dict[str, Any]:
+        """路由主函数"""
+        return self._route(query)[1]
+
 
-# 全局路由器实例
-router = QueryRouter()
+@lru_cache(maxsize=1)
+def _get_router() -> QueryRouter:
+    """获取全局路由器实例（首次使用时创建，避免导入时构建关键词表）"""
+    return QueryRouter()
 
 
-def route_query(query: str) -> Tuple[QueryType, Dict[str, Any]]:
-    """便捷路由函数（向后兼容）"""
-    result = router.route(query)
+def __getattr__(name: str):
+    """兼容旧的模块级 router 属性"""
+    if name == "router":
+        return _get_router()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+@lru_cache(maxsize=4096)
+def _route_cached(query: str) -> Tuple[QueryType, Tuple[Tuple[str, Any], ...]]:
+    """按查询缓存路由结果（返回可哈希形式，路由是query的纯函数）"""
+    mode, result = _get_router()._route(query)
+
+    # 映射新的RouteMode到旧的QueryType（枚举身份比较）
+    query_type = QueryType.SIMPLE_CHAT if mode is RouteMode.CHAT else QueryType.COMPLEX_PLAN
 
-    # 映射新的RouteMode到旧的QueryType
-    mode = result["mode"]
-    if mode == RouteMode.CHAT.value:
-        query_type = QueryType.SIMPLE_CHAT
-    else:  # orchestrate
-        query_type = QueryType.COMPLEX_PLAN
+    return query_type, tuple(result.items())
 
-    return query_type, result
+
+def reset_routing_cache():
+    """清空路由缓存（路由器配置变更后调用）"""
+    _route_cached.cache_clear()
+
+
+def route_query(query: str) -> Tuple[QueryType, Dict[str, Any]]:
+    """便捷路由函数（向后兼容）"""
+    query_type, items = _route_cached(query)
+    # 每次返回新的dict，避免调用方修改污染缓存
+    return query_type, dict(items)
 
 
 def explain_routing(query_type: QueryType, routing_metadata: Dict[str, Any]) -> str:
@@ -4,9 +4,11 @@ Orchestrator相关的Pydantic模型定义
 """
 
 from typing import List, Dict, Any, Optional, Union
-from pydantic import BaseModel, Field, validator
+from pydantic import BaseModel, ConfigDict, Field, PrivateAttr, ValidationError, ValidationInfo, field_validator, model_validator
 from enum import Enum
 
+from schemas.step_graph import dependency_masks, topological_order
+
 
 class StepType(str, Enum):
     """步骤类型枚举"""
@@ -19,7 +21,10 @@ class StepType(str, Enum):
 
 class PlanStep(BaseModel):
     """计划步骤模型"""
+    model_config = ConfigDict(frozen=True)
+
     id: str = Field(..., description="步骤唯一标识")
+    step_id: str = Field("", description="步骤稳定ID，用于执行指针比对")
     type: StepType = Field(..., description="步骤类型")
     tool: Optional[str] = Field(None, description="工具名称（当type为tool_call时必填）")
     inputs: Dict[str, Any] = Field(default_factory=dict, description="步骤输入参数")
@@ -31,46 +36,64 @@ class PlanStep(BaseModel):
 
 class PlannerOutput(BaseModel):
     """Planner输出模型"""
+    model_config = ConfigDict(frozen=True)
+
     goal: str = Field(..., description="任务目标")
-    success_criteria: List[str] = Field(..., min_items=1, description="成功标准列表")
+    success_criteria: List[str] = Field(..., min_length=1, description="成功标准列表")
     max_steps: int = Field(..., gt=0, le=10, description="最大步骤数")
-    steps: List[PlanStep] = Field(..., min_items=1, description="执行步骤列表")
+    steps: List[PlanStep] = Field(..., min_length=1, description="执行步骤列表")
     final_answer_template: str = Field(..., description="最终答案模板")
 
-    @validator('steps')
+    # 校验时计算的拓扑执行顺序（步骤ID列表），供Executor复用
+    _topo_order: List[str] = PrivateAttr(default_factory=list)
+
+    @field_validator('steps')
+    @classmethod
     def validate_steps(cls, v):
         """验证步骤的依赖关系"""
-        step_ids = {step.id for step in v}
-        for step in v:
-            for dep in step.depends_on:
-                if dep not in step_ids:
-                    raise ValueError(f"步骤 {step.id} 依赖不存在的步骤 {dep}")
+        dependency_masks(v)
         return v
 
+    @model_validator(mode='after')
+    def compute_topo_order(self):
+        """计算步骤的拓扑执行顺序"""
+        self._topo_order = [self.steps[i].id for i in topological_order(self.steps)]
+        return self
+
 
 class JudgeOutput(BaseModel):
     """Judge输出模型"""
+    model_config = ConfigDict(frozen=True)
+
     satisfied: bool = Field(..., description="是否满足成功标准")
     missing: List[str] = Field(default_factory=list, description="缺失的信息或证据")
     plan_patch: Optional[Dict[str, Any]] = Field(None, description="计划补丁（当satisfied=false时可选）")
     questions: Optional[List[str]] = Field(None, description="需要询问用户的问题列表（最多2个）")
 
-    @validator('questions')
+    @field_validator('questions')
+    @classmethod
     def validate_questions(cls, v):
         """验证问题数量不超过2个"""
         if v is not None and len(v) > 2:
             raise ValueError("问题数量不能超过2个")
         return v
 
-    @validator('missing', 'questions')
-    def validate_conditional_fields(cls, v, values):
+    @field_validator('missing', 'questions')
+    @classmethod
+    def validate_conditional_fields(cls, v, info: ValidationInfo):
         """当satisfied=false时，至少要有missing或questions之一"""
+        values = info.data
         if not values.get('satisfied', True):
             if not v and not values.get('questions'):
                 raise ValueError("当satisfied=false时，必须提供missing或questions")
         return v
 
 
+def _is_json_error(e: ValidationError) -> bool:
+    """判断校验错误是否来自JSON解析本身"""
+    return any(err["type"] == "json_invalid" for err in e.errors())
+
+
 def validate_planner_output(json_str: str) -> PlannerOutput:
     """
     验证Planner的JSON输出
@@ -84,12 +107,13 @@ def validate_planner_output(json_str: str) -> PlannerOutput:
     Raises:
         ValueError: JSON格式错误或验证失败
     """
-    import json
     try:
-        data = json.loads(json_str)
-        return PlannerOutput(**data)
-    except json.JSONDecodeError as e:
-        raise ValueError(f"JSON解析失败: {e}")
+        # 解析与校验在pydantic-core中一次完成
+        return PlannerOutput.model_validate_json(json_str)
+    except ValidationError as e:
+        if _is_json_error(e):
+            raise ValueError(f"JSON解析失败: {e}")
+        raise ValueError(f"Planner输出验证失败: {e}")
     except Exception as e:
         raise ValueError(f"Planner输出验证失败: {e}")
 
@@ -107,12 +131,12 @@ def validate_judge_output(json_str: str) -> JudgeOutput:
     Raises:
         ValueError: JSON格式错误或验证失败
     """
-    import json
     try:
-        data = json.loads(json_str)
-        return JudgeOutput(**data)
-    except json.JSONDecodeError as e:
-        raise ValueError(f"JSON解析失败: {e}")
+        return JudgeOutput.model_validate_json(json_str)
+    except ValidationError as e:
+        if _is_json_error(e):
+            raise ValueError(f"JSON解析失败: {e}")
+        raise ValueError(f"Judge输出验证失败: {e}")
     except Exception as e:
         raise ValueError(f"Judge输出验证失败: {e}")
 
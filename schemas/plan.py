@@ -4,10 +4,17 @@ Plan结构验证和定义
 """
 import hashlib
 import json
+import re
 from typing import Dict, Any, List, Optional, Union
-from pydantic import BaseModel, Field, validator
+from pydantic import BaseModel, ConfigDict, Field, PrivateAttr, ValidationInfo, field_validator, model_validator
 from enum import Enum
 
+from schemas.step_graph import dependency_masks, topological_order
+
+# ask_user问题分类关键词（先判地点再判时间，与关键词在问题中的先后无关）
+_LOCATION_QUESTION_RE = re.compile("城市|city|地点|location", re.IGNORECASE)
+_DATETIME_QUESTION_RE = re.compile("日期|时间|date|time|when", re.IGNORECASE)
+
 
 class StepType(str, Enum):
     """步骤类型枚举"""
@@ -24,6 +31,8 @@ class StepType(str, Enum):
 
 class PlanStep(BaseModel):
     """计划步骤模型"""
+    model_config = ConfigDict(frozen=True)
+
     id: str = Field(..., description="步骤唯一标识符")
     step_id: str = Field("", description="步骤稳定ID，用于执行指针比对")
     type: StepType = Field(..., description="步骤类型")
@@ -34,42 +43,50 @@ class PlanStep(BaseModel):
     output_key: str = Field(..., description="输出结果的键名")
     retry: int = Field(1, ge=0, le=3, description="重试次数（0-3次）")
 
-    @validator('tool')
-    def validate_tool_requirement(cls, v, values):
+    @field_validator('tool')
+    @classmethod
+    def validate_tool_requirement(cls, v, info: ValidationInfo):
         """验证工具字段"""
-        if values.get('type') == StepType.TOOL_CALL and not v:
+        if info.data.get('type') == StepType.TOOL_CALL and not v:
             raise ValueError("当type为tool_call时，tool字段为必填项")
         return v
 
 
 class Plan(BaseModel):
     """完整计划模型"""
+    model_config = ConfigDict(frozen=True)
+
     goal: str = Field(..., description="总体目标描述")
-    success_criteria: List[str] = Field(..., min_items=1, description="成功标准列表")
+    success_criteria: List[str] = Field(..., min_length=1, description="成功标准列表")
     max_steps: int = Field(6, ge=1, le=10, description="最大步骤数")
-    steps: List[PlanStep] = Field(..., min_items=1, description="步骤列表")
+    steps: List[PlanStep] = Field(..., min_length=1, description="步骤列表")
     final_answer_template: str = Field(..., description="最终答案模板")
 
-    @validator('steps')
+    # 校验时计算的拓扑执行顺序（步骤ID列表）
+    _topo_order: List[str] = PrivateAttr(default_factory=list)
+
+    @field_validator('steps')
+    @classmethod
     def validate_step_dependencies(cls, v):
         """验证步骤依赖关系"""
-        step_ids = {step.id for step in v}
-
-        for step in v:
-            for dep in step.depends_on:
-                if dep not in step_ids:
-                    raise ValueError(f"步骤 {step.id} 依赖的步骤 {dep} 不存在")
-
+        dependency_masks(v)
         return v
 
-    @validator('steps')
-    def validate_max_steps(cls, v, values):
+    @field_validator('steps')
+    @classmethod
+    def validate_max_steps(cls, v, info: ValidationInfo):
         """验证步骤数量不超过最大限制"""
-        max_steps = values.get('max_steps', 6)
+        max_steps = info.data.get('max_steps', 6)
         if len(v) > max_steps:
             raise ValueError(f"步骤数量 {len(v)} 超过最大限制 {max_steps}")
         return v
 
+    @model_validator(mode='after')
+    def compute_topo_order(self):
+        """计算步骤的拓扑执行顺序"""
+        self._topo_order = [self.steps[i].id for i in topological_order(self.steps)]
+        return self
+
 
 class PlanValidationError(Exception):
     """计划验证错误"""
@@ -105,9 +122,9 @@ def compute_step_id(step_dict: Dict[str, Any]) -> str:
     if step_dict.get("type") == "ask_user":
         question = step_dict.get("inputs", {}).get("question", "")
         # 提取问题模式：城市/日期/地点等关键词（只用于分类，不签原始文本）
-        if any(word in question.lower() for word in ["城市", "city", "地点", "location"]):
+        if _LOCATION_QUESTION_RE.search(question):
             signature_data["question_type"] = "location"
-        elif any(word in question.lower() for word in ["日期", "时间", "date", "time", "when"]):
+        elif _DATETIME_QUESTION_RE.search(question):
             signature_data["question_type"] = "datetime"
         else:
             signature_data["question_type"] = "general"
@@ -139,12 +156,9 @@ def validate_plan(plan_data: Union[Dict[str, Any], str]) -> Plan:
     """
     try:
         if isinstance(plan_data, str):
-            import json
-            plan_dict = json.loads(plan_data)
-        else:
-            plan_dict = plan_data
+            return Plan.model_validate_json(plan_data)
 
-        return Plan(**plan_dict)
+        return Plan.model_validate(plan_data)
 
     except Exception as e:
         raise PlanValidationError(f"计划验证失败: {str(e)}")
@@ -194,7 +208,7 @@ if __name__ == "__main__":
 
     # 测试验证
     try:
-        validated_plan = validate_plan(sample_plan.dict())
+        validated_plan = validate_plan(sample_plan.model_dump())
         print("✅ 计划验证通过")
     except PlanValidationError as e:
         print(f"❌ 计划验证失败: {e}")
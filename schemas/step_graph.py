@@ -0,0 +1,62 @@
+"""
+计划步骤依赖图工具
+供 schemas.orchestrator / schemas.plan 两套计划模型及 Executor 共用
+"""
+
+from typing import List, Any, Optional
+
+
+def dependency_masks(steps: List[Any]) -> List[int]:
+    """
+    单次遍历校验步骤依赖，返回每个步骤的依赖位图
+
+    位图的第 i 位对应 steps 中的第 i 个步骤，只在同一个列表内有意义
+
+    Raises:
+        ValueError: 依赖了不存在的步骤
+    """
+    ids = {step.id: i for i, step in enumerate(steps)}
+    masks = []
+    for step in steps:
+        dep_mask = 0
+        for dep in step.depends_on:
+            dep_index = ids.get(dep)
+            if dep_index is None:
+                raise ValueError(f"步骤 {step.id} 依赖不存在的步骤 {dep}")
+            dep_mask |= 1 << dep_index
+        masks.append(dep_mask)
+    return masks
+
+
+def topological_order(steps: List[Any], masks: Optional[List[int]] = None) -> List[int]:
+    """
+    基于依赖位图的Kahn拓扑排序
+
+    同一层按步骤ID排序；存在循环依赖时剩余步骤按原顺序追加
+
+    Args:
+        steps: 步骤列表
+        masks: 由 dependency_masks(steps) 得到的依赖位图，缺省时现场计算
+
+    Returns:
+        步骤下标的执行顺序
+
+    Raises:
+        ValueError: 依赖了不存在的步骤
+    """
+    if masks is None:
+        masks = dependency_masks(steps)
+    order = []
+    done_mask = 0
+    remaining = list(range(len(steps)))
+    while remaining:
+        ready = [i for i in remaining if masks[i] & ~done_mask == 0]
+        if not ready:
+            order.extend(remaining)
+            break
+        ready.sort(key=lambda i: steps[i].id)
+        for i in ready:
+            done_mask |= 1 << i
+        order.extend(ready)
+        remaining = [i for i in remaining if not done_mask >> i & 1]
+    return order
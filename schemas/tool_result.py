@@ -2,8 +2,9 @@
 标准工具返回结构定义
 所有工具必须遵循此返回格式
 """
+import time
 from typing import Dict, Any, Optional
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict, model_validator
 from enum import Enum
 
 
@@ -18,6 +19,8 @@ class ErrorCode(str, Enum):
 
 class ToolError(BaseModel):
     """工具错误信息"""
+    model_config = ConfigDict(frozen=True)
+
     code: ErrorCode
     message: str
     retryable: bool = True
@@ -25,6 +28,8 @@ class ToolError(BaseModel):
 
 class ToolMeta(BaseModel):
     """工具调用元数据"""
+    model_config = ConfigDict(frozen=True)
+
     source: str  # 工具名称
     latency_ms: int
     params: Dict[str, Any]  # 调用参数
@@ -36,18 +41,21 @@ class StandardToolResult(BaseModel):
 
     所有工具必须返回此格式，不得抛出未捕获异常
     """
+    model_config = ConfigDict(frozen=True)
+
     ok: bool
     data: Optional[Dict[str, Any]] = None  # 成功时的数据
     error: Optional[ToolError] = None      # 失败时的错误信息
     meta: ToolMeta                          # 元数据
 
-    def __init__(self, **data):
-        super().__init__(**data)
-        # 验证结构完整性
+    @model_validator(mode='after')
+    def _check_invariants(self):
+        """验证结构完整性"""
         if self.ok and self.error is not None:
             raise ValueError("ok=True 时不能有error")
         if not self.ok and self.error is None:
             raise ValueError("ok=False 时必须有error")
+        return self
 
     @classmethod
     def success(cls, data: Dict[str, Any], meta: ToolMeta) -> 'StandardToolResult':
@@ -69,6 +77,12 @@ def create_tool_meta(source: str, latency_ms: int, params: Dict[str, Any]) -> To
     return ToolMeta(source=source, latency_ms=latency_ms, params=params)
 
 
+def create_tool_meta_since(source: str, start_ns: int, params: Dict[str, Any]) -> ToolMeta:
+    """创建工具元数据，耗时由 time.perf_counter_ns() 记录的起点算出"""
+    latency_ms = (time.perf_counter_ns() - start_ns) // 1_000_000
+    return ToolMeta(source=source, latency_ms=latency_ms, params=params)
+
+
 def create_tool_error(code: ErrorCode, message: str, retryable: bool = True) -> ToolError:
     """创建工具错误"""
     return ToolError(code=code, message=message, retryable=retryable)
@@ -13,8 +13,9 @@ Arguments:
 """
 
 import sys
-import json
+import hashlib
 import argparse
+from dataclasses import dataclass, fields
 from typing import Dict, Any, Optional
 from pathlib import Path
 
@@ -22,45 +23,77 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from telemetry import get_telemetry_logger, TelemetryRecord
+from utils.json_codec import dumps as json_dumps
 from orchestrator import orchestrate_query
 from logger import get_logger
 
 logger = get_logger()
 
 
+def print_json(data: Any):
+    """以缩进JSON输出到stdout"""
+    sys.stdout.flush()
+    sys.stdout.buffer.write(json_dumps(data, indent=True) + b"\n")
+    sys.stdout.buffer.flush()
+
+
+@dataclass(frozen=True, slots=True)
+class ReplayMetrics:
+    """用于比较原始请求与重放结果的指标"""
+    status: Optional[str]
+    tool_calls: int
+    final_answer_hash: Optional[str]
+
+
+_METRIC_FIELDS = fields(ReplayMetrics)
+
+
+def _extract_metrics(data: Dict[str, Any]) -> ReplayMetrics:
+    """从原始请求数据或重放结果中一次性提取比较指标"""
+    final_result = data.get("final_result") or {}
+    final_answer = data.get("final_answer") or final_result.get("final_answer")
+    return ReplayMetrics(
+        status=data.get("status", final_result.get("status")),
+        tool_calls=data.get("total_tool_calls") or final_result.get("tool_calls", 0),
+        final_answer_hash=hashlib.sha256(final_answer.encode()).hexdigest()[:16] if final_answer else None
+    )
+
+
 class ReplayEngine:
     """重放引擎"""
 
     def __init__(self):
         self.telemetry = get_telemetry_logger()
 
-    def find_request_data(self, request_id: str) -> Optional[Dict[str, Any]]:
+    def find_request_data(self, request_id: str, include_events: bool = True) -> Optional[Dict[str, Any]]:
         """
         从telemetry日志中查找请求数据
 
         Args:
             request_id: 请求ID
+            include_events: 是否保留完整事件列表（实际重放只需要查询本身）
 
         Returns:
             请求的完整数据或None
         """
-        events = self.telemetry.get_request_events(request_id)
-        if not events:
-            return None
-
         # 重建请求上下文
         request_data = {
             "request_id": request_id,
             "user_query": "",
             "events": [],
+            "event_count": 0,
             "plan": None,
             "artifacts": {},
             "models": {},
             "final_result": None
         }
 
-        for event in events:
-            request_data["events"].append(event.dict())
+        # 流式处理事件，不预先加载整个事件列表
+        for event in self.telemetry.iter_request_events(request_id):
+            request_data["event_count"] += 1
+            if include_events:
+                # 保留TelemetryRecord对象，仅在输出JSON时序列化（见print_json）
+                request_data["events"].append(event)
 
             # 提取关键信息
             if not request_data["user_query"]:
@@ -75,9 +108,12 @@ class ReplayEngine:
             if event.model:
                 request_data["models"].update(event.model)
 
+        if not request_data["event_count"]:
+            return None
+
         return request_data
 
-    def replay_request(self, request_id: str, dry_run: bool = False) -> Dict[str, Any]:
+    async def replay_request(self, request_id: str, dry_run: bool = False) -> Dict[str, Any]:
         """
         重放请求
 
@@ -90,13 +126,13 @@ class ReplayEngine:
         """
         logger.info(f"开始重放请求: {request_id}")
 
-        # 查找原始请求数据
-        original_data = self.find_request_data(request_id)
+        # 查找原始请求数据（实际重放时不需要序列化每个事件）
+        original_data = self.find_request_data(request_id, include_events=dry_run)
         if not original_data:
             raise ValueError(f"找不到请求数据: {request_id}")
 
         logger.info(f"原始查询: {original_data['user_query']}")
-        logger.info(f"事件数量: {len(original_data['events'])}")
+        logger.info(f"事件数量: {original_data['event_count']}")
         logger.info(f"使用的模型: {original_data['models']}")
 
         if dry_run:
@@ -145,30 +181,25 @@ class ReplayEngine:
         Returns:
             比较分析
         """
+        orig_metrics = _extract_metrics(original)
+        replay_metrics = _extract_metrics(replay)
+
         comparison = {
             "query_match": original["user_query"] == (replay.get("final_answer") or ""),
-            "status_match": True,  # 假设重放成功
+            "status_match": orig_metrics.status == replay_metrics.status,
             "differences": []
         }
 
-        # 比较状态
-        if original.get("final_result", {}).get("status") != replay.get("status"):
-            comparison["status_match"] = False
-            comparison["differences"].append({
-                "type": "status",
-                "original": original.get("final_result", {}).get("status"),
-                "replay": replay.get("status")
-            })
-
-        # 比较工具调用次数
-        orig_tool_calls = original.get("final_result", {}).get("tool_calls", 0)
-        replay_tool_calls = replay.get("total_tool_calls", 0)
-        if orig_tool_calls != replay_tool_calls:
-            comparison["differences"].append({
-                "type": "tool_calls",
-                "original": orig_tool_calls,
-                "replay": replay_tool_calls
-            })
+        # 逐字段比较指标
+        for field in _METRIC_FIELDS:
+            orig_value = getattr(orig_metrics, field.name)
+            replay_value = getattr(replay_metrics, field.name)
+            if orig_value != replay_value:
+                comparison["differences"].append({
+                    "type": field.name,
+                    "original": orig_value,
+                    "replay": replay_value
+                })
 
         return comparison
 
@@ -195,7 +226,7 @@ class ReplayEngine:
             "comparison": {
                 "query_same": data1["user_query"] == data2["user_query"],
                 "model_same": data1["models"] == data2["models"],
-                "event_count_diff": len(data1["events"]) - len(data2["events"])
+                "event_count_diff": data1["event_count"] - data2["event_count"]
             }
         }
 
@@ -214,17 +245,17 @@ def main():
         if args.compare_with:
             # 比较模式
             result = engine.compare_requests(args.request_id, args.compare_with)
-            print(json.dumps(result, ensure_ascii=False, indent=2))
+            print_json(result)
 
         else:
             # 重放模式
             import asyncio
             result = asyncio.run(engine.replay_request(args.request_id, args.dry_run))
-            print(json.dumps(result, ensure_ascii=False, indent=2))
+            print_json(result)
 
     except Exception as e:
         logger.error(f"Replay failed: {e}")
-        print(json.dumps({"error": str(e)}, ensure_ascii=False, indent=2))
+        print_json({"error": str(e)})
         sys.exit(1)
 
 
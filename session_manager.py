@@ -1,15 +1,26 @@
 """
 Session管理器 - 处理session_id绑定和粘性会话
 """
-import uuid
-import json
 import os
 from pathlib import Path
 from typing import Optional, Dict, Any
 import logging
 
+from utils.ids import fast_uuid4
+from utils.json_codec import dumps as json_dumps, loads as json_loads
+
 logger = logging.getLogger(__name__)
 
+# session状态目录（导入时创建一次，保存时不再逐次mkdir）
+_SESSION_DIR = Path("data/sessions")
+_SESSION_DIR.mkdir(parents=True, exist_ok=True)
+
+# 每个完整快照之后最多追加的增量补丁条数，超过后重写快照（压缩补丁文件）
+_SNAPSHOT_EVERY = 50
+
+# 本进程内各session自上次快照以来追加的补丁条数
+_patch_counts: Dict[str, int] = {}
+
 
 class SessionManager:
     """Session管理器"""
@@ -17,7 +28,7 @@ class SessionManager:
     @staticmethod
     def generate_session_id() -> str:
         """生成唯一的session_id"""
-        return str(uuid.uuid4())
+        return fast_uuid4()
 
     @staticmethod
     def get_or_create_session_id(cl_user_session) -> str:
@@ -53,8 +64,8 @@ class SessionManager:
             return False
 
         pending_ask = session.pending_ask
-        if not hasattr(pending_ask, 'ask_id'):
-            logger.warning("PendingAsk没有ask_id字段")
+        if not pending_ask.ask_id:
+            logger.warning("PendingAsk没有ask_id")
             return False
 
         if pending_ask.ask_id != current_ask_id:
@@ -72,49 +83,118 @@ class SessionManager:
 
     @staticmethod
     def save_execution_state(session_id: str, execution_state):
-        """保存execution_state到磁盘"""
+        """
+        保存execution_state到磁盘
+
+        首次保存写完整快照（{session_id}_execution.json），之后只把修改过的字段
+        作为补丁追加到 {session_id}_execution.jsonl，每 _SNAPSHOT_EVERY 条补丁重写一次快照；
+        artifacts只写改动过的产出项（加载时合并），不随每个步骤重写整个字典
+        """
         try:
-            # 创建session目录
-            session_dir = Path("data/sessions")
-            session_dir.mkdir(parents=True, exist_ok=True)
-
-            # 保存execution_state
-            state_file = session_dir / f"{session_id}_execution.json"
-
-            # 使用Pydantic的model_dump进行序列化
-            if hasattr(execution_state, 'model_dump'):
-                state_data = execution_state.model_dump()
-            else:
-                # 回退到手动序列化
-                state_data = {
-                    "cursor_index": execution_state.cursor_index,
-                    "done_set": list(execution_state.done_set),
-                    "asked_map": dict(execution_state.asked_map),
-                    "answers": dict(execution_state.answers),
-                    "artifacts": dict(execution_state.artifacts),
-                    "errors": list(execution_state.errors),
-                    "completed_steps": list(execution_state.completed_steps),
-                    "asked_questions": list(execution_state.asked_questions)
-                }
-
-            with open(state_file, 'w', encoding='utf-8') as f:
-                json.dump(state_data, f, ensure_ascii=False, indent=2)
-
-            logger.debug(f"已保存execution_state到 {state_file}")
+            try:
+                SessionManager._write_execution_state(session_id, execution_state)
+            except FileNotFoundError:
+                # session目录被外部删除：重建目录并写完整快照
+                _SESSION_DIR.mkdir(parents=True, exist_ok=True)
+                _patch_counts.pop(session_id, None)
+                SessionManager._write_execution_state(session_id, execution_state)
 
         except Exception as e:
+            # 修改标记仍保留；补丁文件可能留下半行，下次保存改写完整快照
+            _patch_counts.pop(session_id, None)
             logger.error(f"保存execution_state失败: {e}")
 
+    @staticmethod
+    def _write_execution_state(session_id: str, execution_state):
+        """写入execution_state快照或增量补丁（文件错误由调用方处理，写入成功后才清除修改标记）"""
+        state_file = _SESSION_DIR / f"{session_id}_execution.json"
+        patch_file = _SESSION_DIR / f"{session_id}_execution.jsonl"
+
+        dirty = execution_state.get_dirty() if hasattr(execution_state, 'get_dirty') else None
+        patch_count = _patch_counts.get(session_id)
+
+        # 增量保存：只追加修改过的字段和产出项
+        if dirty is not None and patch_count is not None and patch_count < _SNAPSHOT_EVERY:
+            fields, artifact_keys = dirty
+            if not fields and not artifact_keys:
+                return
+            entry = {"patch": execution_state.model_dump(include=fields)}
+            if artifact_keys and "artifacts" not in fields:
+                artifacts = execution_state.artifacts
+                entry["artifacts"] = {key: artifacts[key] for key in artifact_keys if key in artifacts}
+            with open(patch_file, 'ab') as f:
+                f.write(json_dumps(entry) + b'\n')
+            execution_state.clear_dirty(fields, artifact_keys)
+            _patch_counts[session_id] = patch_count + 1
+            logger.debug(f"已追加execution_state补丁到 {patch_file}: {sorted(fields)} {sorted(artifact_keys)}")
+            return
+
+        # 使用Pydantic的model_dump进行序列化
+        if hasattr(execution_state, 'model_dump'):
+            state_data = execution_state.model_dump()
+        else:
+            # 回退到手动序列化（直接引用原容器，集合由json_dumps转为列表，无需复制）
+            state_data = {
+                "cursor_index": execution_state.cursor_index,
+                "done_set": execution_state.done_set,
+                "asked_map": execution_state.asked_map,
+                "answers": execution_state.answers,
+                "artifacts": execution_state.artifacts,
+                "errors": execution_state.errors,
+                "completed_steps": execution_state.completed_steps,
+                "asked_questions": execution_state.asked_questions
+            }
+
+        # 先写临时文件再原子替换，崩溃时不会留下写了一半的快照（fsync见flush_session）
+        tmp_file = state_file.with_suffix('.json.tmp')
+        with open(tmp_file, 'wb') as f:
+            f.write(json_dumps(state_data, indent=True))
+        os.replace(tmp_file, state_file)
+
+        # 新快照已包含全部字段，旧补丁作废
+        patch_file.unlink(missing_ok=True)
+        if dirty is not None:
+            execution_state.clear_dirty(*dirty)
+        _patch_counts[session_id] = 0
+
+        logger.debug(f"已保存execution_state到 {state_file}")
+
+    @staticmethod
+    def flush_session(session_id: str):
+        """把session的快照和补丁文件fsync到磁盘（会话结束时调用，保存路径上不做fsync）"""
+        for path in (_SESSION_DIR / f"{session_id}_execution.json",
+                     _SESSION_DIR / f"{session_id}_execution.jsonl"):
+            try:
+                fd = os.open(path, os.O_RDONLY)
+            except FileNotFoundError:
+                continue
+            try:
+                os.fsync(fd)
+            except OSError as e:
+                logger.error(f"同步session文件失败: {path}: {e}")
+            finally:
+                os.close(fd)
+
     @staticmethod
     def load_execution_state(session_id: str):
-        """从磁盘加载execution_state"""
+        """从磁盘加载execution_state（快照 + 按顺序重放增量补丁）"""
         try:
-            state_file = Path("data/sessions") / f"{session_id}_execution.json"
+            state_file = _SESSION_DIR / f"{session_id}_execution.json"
             if not state_file.exists():
                 return None
 
-            with open(state_file, 'r', encoding='utf-8') as f:
-                state_data = json.load(f)
+            with open(state_file, 'rb') as f:
+                state_data = json_loads(f.read())
+
+            patch_file = state_file.with_suffix(".jsonl")
+            if patch_file.exists():
+                with open(patch_file, 'rb') as f:
+                    for line in f:
+                        if line.strip():
+                            entry = json_loads(line)
+                            state_data.update(entry["patch"])
+                            if "artifacts" in entry:
+                                state_data.setdefault("artifacts", {}).update(entry["artifacts"])
 
             # 反序列化为ExecutionState对象
             from orchestrator.executor import ExecutionState
@@ -3,15 +3,23 @@
 提供 sessions[session_id] = { active_task, pending_ask, state } 支持
 支持 AskUser → 续跑闭环，会话态自动管理
 """
+import re
 import time
-import uuid
 from typing import Dict, Any, Optional
 from orchestrator.orchestrator import SessionState, ActiveTask, PendingAsk
 from orchestrator import get_session
+from utils.ids import fast_uuid4
 from logger import get_logger
 
 logger = get_logger()
 
+# 新任务关键词（单个预编译正则，忽略大小写，一次扫描完成匹配）
+_NEW_TASK_KEYWORDS = (
+    "新的问题", "new question", "reset", "重来", "重新开始",
+    "新任务", "new task", "clear", "清除", "开始新任务"
+)
+_NEW_TASK_RE = re.compile("|".join(map(re.escape, _NEW_TASK_KEYWORDS)), re.IGNORECASE)
+
 
 def get_session_state(session_id: str) -> SessionState:
     """
@@ -62,23 +70,21 @@ def resume_with_answer(session_id: str, answer: str) -> Optional[SessionState]:
     try:
         session = get_session(session_id)
 
-        if not session.has_pending_ask():
+        # 一次读取挂起问题和活跃任务，后续只使用本地引用
+        pending_ask = session.pending_ask
+        if pending_ask is None:
             logger.warning(f"会话 {session_id} 没有挂起的问题")
             return None
 
         # 清除pending状态
-        pending_ask = session.pending_ask
         session.clear_pending_ask()
 
         # 将答案填入execution state
-        if session.active_task and session.active_task.execution_state:
+        active_task = session.active_task
+        execution_state = active_task.execution_state if active_task else None
+        if execution_state:
             # 根据期望的答案类型设置参数
-            if "city" in pending_ask.expects.lower():
-                session.active_task.execution_state.set_artifact("user_city", answer)
-            elif "date" in pending_ask.expects.lower():
-                session.active_task.execution_state.set_artifact("user_date", answer)
-            else:
-                session.active_task.execution_state.set_artifact("user_answer", answer)
+            execution_state.set_user_answer(pending_ask.expects, answer)
 
             logger.info(f"用户答案已写入execution_state: {answer}")
             return session
@@ -101,12 +107,9 @@ def is_new_task_request(user_input: str) -> bool:
     Returns:
         bool: 是否是新任务请求
     """
-    new_task_keywords = [
-        "新的问题", "new question", "reset", "重来", "重新开始",
-        "新任务", "new task", "clear", "清除", "开始新任务"
-    ]
-    query_lower = user_input.lower().strip()
-    return any(keyword in query_lower for keyword in new_task_keywords)
+    if not user_input:
+        return False
+    return _NEW_TASK_RE.search(user_input) is not None
 
 
 def cleanup_session(session_id: str) -> bool:
@@ -122,6 +125,11 @@ def cleanup_session(session_id: str) -> bool:
     try:
         session = get_session(session_id)
         session.end_task()
+
+        # 任务结束时把已持久化的执行状态同步到磁盘
+        from session_manager import session_manager
+        session_manager.flush_session(session_id)
+
         logger.info(f"会话清理完成: {session_id}")
         return True
     except Exception as e:
@@ -140,30 +148,28 @@ def get_session_summary(session_id: str) -> Dict[str, Any]:
         Dict: 会话摘要信息
     """
     try:
-        session = get_session(session_id)
-
-        summary = {
-            "session_id": session_id,
-            "has_active_task": session.active_task is not None,
-            "has_pending_ask": session.has_pending_ask(),
-            "created_at": session.created_at,
-            "task_age_seconds": None,
-            "pending_question": None
-        }
-
-        if session.active_task:
-            summary["task_age_seconds"] = time.time() - session.active_task.created_at
-
-        if session.has_pending_ask():
-            summary["pending_question"] = session.pending_ask.question
-
-        return summary
+        return _summarize_session(session_id, get_session(session_id))
 
     except Exception as e:
         logger.error(f"获取会话摘要失败: {e}")
         return {"error": str(e)}
 
 
+def _summarize_session(session_id: str, session: SessionState) -> Dict[str, Any]:
+    """根据已取得的会话对象生成摘要（不重复查找会话）"""
+    active_task = session.active_task
+    pending_ask = session.pending_ask
+
+    return {
+        "session_id": session_id,
+        "has_active_task": active_task is not None,
+        "has_pending_ask": pending_ask is not None,
+        "created_at": session.created_at,
+        "task_age_seconds": time.time() - active_task.created_at if active_task else None,
+        "pending_question": pending_ask.question if pending_ask else None
+    }
+
+
 def list_active_sessions() -> Dict[str, Dict[str, Any]]:
     """
     列出所有活跃会话
@@ -171,19 +177,26 @@ def list_active_sessions() -> Dict[str, Dict[str, Any]]:
     Returns:
         Dict: 会话ID到摘要的映射
     """
-    from orchestrator.orchestrator import _sessions
+    from orchestrator.orchestrator import _sessions, _active_sessions
 
     active_sessions = {}
     current_time = time.time()
 
-    for session_id, session in _sessions.items():
+    # 只遍历登记过的活跃会话，不扫描全部会话
+    for session_id in list(_active_sessions):
+        session = _sessions.get(session_id)
+        if session is None:
+            _active_sessions.discard(session_id)
+            continue
+
         # 检查是否有活跃任务或挂起问题
-        if session.active_task or session.has_pending_ask():
+        active_task = session.active_task
+        if active_task or session.pending_ask:
             # 检查任务是否仍然活跃（1小时超时）
-            if session.active_task and current_time - session.active_task.created_at > 3600:
+            if active_task and current_time - active_task.created_at > 3600:
                 continue
 
-            active_sessions[session_id] = get_session_summary(session_id)
+            active_sessions[session_id] = _summarize_session(session_id, session)
 
     return active_sessions
 
@@ -206,7 +219,7 @@ def get_or_create_session(session_id: Optional[str] = None) -> str:
         str: 会话ID
     """
     if session_id is None:
-        session_id = str(uuid.uuid4())
+        session_id = fast_uuid4()
 
     # 获取会话（会自动创建如果不存在）
     get_session(session_id)
@@ -3,20 +3,64 @@ Telemetry v1 核心实现
 错误与偏差数据集收集和分析系统
 """
 
+import os
 import json
+import queue
+import atexit
 import hashlib
-import uuid
 from datetime import datetime, timezone
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Iterator, Tuple
 from pathlib import Path
 from enum import Enum
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 import threading
-
+from collections import Counter
+from functools import lru_cache
+from itertools import islice
+
+try:
+    import xxhash
+    XXHASH_AVAILABLE = True
+except ImportError:
+    XXHASH_AVAILABLE = False
+
+from utils.ids import fast_uuid4
+from utils.json_codec import dumps as json_dumps, loads as json_loads
 from logger import get_logger
 
 logger = get_logger()
 
+def _content_hash(content: str) -> str:
+    """查询+计划的64位去重哈希（优先xxh3，未安装时回退到截断的SHA-256）"""
+    if XXHASH_AVAILABLE:
+        return xxhash.xxh3_64_hexdigest(content.encode())
+    return hashlib.sha256(content.encode()).hexdigest()[:16]
+
+
+# 可安全作为缓存键的值类型（容器内的 1、True、1.0 相等却序列化不同，不走缓存）
+_PLAN_JSON_CACHEABLE = (str, int, float, bool, type(None))
+
+
+@lru_cache(maxsize=1024)
+def _plan_json_cached(items: frozenset) -> str:
+    """计划摘录的规范化JSON（同一请求的多个事件通常共用同一份计划摘录）"""
+    return json.dumps({key: value for key, _, value in items}, sort_keys=True)
+
+
+def _plan_json(plan_excerpt: Optional[Dict[str, Any]]) -> str:
+    """计划摘录的规范化JSON，值不全是标量时直接序列化"""
+    if not plan_excerpt:
+        return "{}"
+    if all(type(value) in _PLAN_JSON_CACHEABLE for value in plan_excerpt.values()):
+        # 键中带上值的类型：1、True、1.0 相等且哈希相同，但序列化结果不同
+        return _plan_json_cached(frozenset((key, type(value), value) for key, value in plan_excerpt.items()))
+    return json.dumps(plan_excerpt, sort_keys=True, default=str)
+
+
+def _enum_value(value: Any) -> Any:
+    """枚举取值，索引统一以字符串为键"""
+    return value.value if isinstance(value, Enum) else value
+
 
 class TelemetryEvent(str, Enum):
     """Telemetry事件类型枚举"""
@@ -40,6 +84,8 @@ class TelemetryStage(str, Enum):
 
 class TelemetryRecord(BaseModel):
     """Telemetry记录结构"""
+    model_config = ConfigDict(frozen=True)
+
     ts: str = Field(..., description="ISO格式时间戳")
     request_id: str = Field(..., description="请求唯一ID")
     stage: TelemetryStage = Field(..., description="执行阶段")
@@ -53,8 +99,20 @@ class TelemetryRecord(BaseModel):
     hash: str = Field(..., description="查询+计划的稳定哈希")
 
     def to_jsonl(self) -> str:
-        """转换为JSONL格式"""
-        return json.dumps(self.dict(), ensure_ascii=False, separators=(',', ':'))
+        """转换为JSONL格式（pydantic-core直接序列化，不经过中间dict）"""
+        return self.model_dump_json()
+
+
+# 每个线程复用一个键齐全的记录字典，避免每个事件都分配并校验模型
+_tls = threading.local()
+
+
+def _record_buffer() -> Dict[str, Any]:
+    """获取当前线程的记录字典（键顺序与TelemetryRecord字段一致）"""
+    record = getattr(_tls, "record", None)
+    if record is None:
+        record = _tls.record = dict.fromkeys(TelemetryRecord.model_fields)
+    return record
 
 
 class TelemetryLogger:
@@ -68,12 +126,186 @@ class TelemetryLogger:
         # 统计信息
         self.stats = {
             "total_events": 0,
-            "events_by_type": {},
-            "events_by_stage": {}
+            "events_by_type": Counter(),
+            "events_by_stage": Counter()
         }
 
+        # 按事件类型/阶段/请求ID记录行的字节偏移，过滤查询只读取命中的行
+        # _indexed_size 为索引已覆盖的文件前缀长度：本写线程紧接其后写入时直接追加索引，
+        # 其他进程/记录器追加的行由过滤查询前的补扫描纳入索引
+        self._index_lock = threading.Lock()
+        self._index_built = False
+        self._indexed_size = 0
+        self._offsets_by_event: Dict[str, List[int]] = {}
+        self._offsets_by_stage: Dict[str, List[int]] = {}
+        self._offsets_by_request: Dict[str, List[int]] = {}
+
+        # 后台写入线程：事件行入队，由写线程批量写入常驻打开的文件句柄
+        # 队列元素为 (UTF-8编码的JSON行, 事件类型, 阶段, 请求ID)，None 为关闭标记
+        # 枚举到字符串的转换放在写线程中完成，不占用调用方时间
+        self._queue: "queue.Queue[Optional[Tuple[bytes, TelemetryEvent, TelemetryStage, str]]]" = queue.Queue()
+        self._writer = threading.Thread(target=self._writer_loop, name="telemetry-writer", daemon=True)
+        self._writer.start()
+        atexit.register(self.close)
+
+        # 搜索结果缓存，键包含日志文件的mtime和大小，文件变化后自动失效
+        self._search_cached = lru_cache(maxsize=256)(self._search_uncached)
+
         logger.info(f"Telemetry日志记录器初始化: {self.log_file}")
 
+    def _writer_loop(self):
+        """后台写入循环：阻塞取一条，再取空队列中已积压的事件，一次os.write写入"""
+        # 追加写文件描述符直接写入，不经过Python io缓冲层（仅本线程写入）
+        # 打开或写入失败时记录错误并丢弃该批事件，下一批重新打开，写线程不会因此退出
+        fd = None
+        try:
+            while True:
+                batch = [self._queue.get()]
+                while True:
+                    try:
+                        batch.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+
+                items = [item for item in batch if item is not None]
+                try:
+                    if items:
+                        if fd is None:
+                            fd = self._open_log()
+                        parts = [item[0] for item in items]
+                        with self._index_lock:
+                            offset = os.lseek(fd, 0, os.SEEK_END)
+                            data = memoryview(b''.join(parts))
+                            while data:
+                                data = data[os.write(fd, data):]
+                            # 只有紧接索引覆盖范围写入时才直接记入索引，否则留给补扫描
+                            if self._index_built and offset == self._indexed_size:
+                                for (_, event, stage, request_id), part in zip(items, parts):
+                                    self._index_line(offset, _enum_value(event), _enum_value(stage), request_id)
+                                    offset += len(part)
+                                self._indexed_size = offset
+                except Exception as e:
+                    logger.error(f"写入telemetry日志失败: {e}")
+                    if fd is not None:
+                        os.close(fd)
+                        fd = None
+                finally:
+                    for _ in batch:
+                        self._queue.task_done()
+
+                # 收到关闭标记（None）后落盘并退出
+                if len(items) != len(batch):
+                    if fd is not None:
+                        try:
+                            os.fsync(fd)
+                        except OSError as e:
+                            logger.error(f"同步telemetry日志失败: {e}")
+                    return
+        finally:
+            if fd is not None:
+                os.close(fd)
+
+    def _open_log(self) -> int:
+        """以追加模式打开日志文件，返回文件描述符"""
+        return os.open(str(self.log_file), os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+
+    def _write_direct(self, line: bytes) -> bool:
+        """写线程已退出（如close之后）时同步追加一行，索引由过滤查询前的补扫描纳入"""
+        try:
+            fd = self._open_log()
+            try:
+                data = memoryview(line)
+                while data:
+                    data = data[os.write(fd, data):]
+            finally:
+                os.close(fd)
+            return True
+        except Exception as e:
+            logger.error(f"写入telemetry日志失败: {e}")
+            return False
+
+    def _index_line(self, offset: int, event: str, stage: str, request_id: str):
+        """把一行的偏移加入索引（调用方持有_index_lock）"""
+        self._offsets_by_event.setdefault(event, []).append(offset)
+        self._offsets_by_stage.setdefault(stage, []).append(offset)
+        self._offsets_by_request.setdefault(request_id, []).append(offset)
+
+    def _reset_index(self):
+        """清空偏移索引（调用方持有_index_lock）"""
+        self._offsets_by_event.clear()
+        self._offsets_by_stage.clear()
+        self._offsets_by_request.clear()
+        self._indexed_size = 0
+
+    def _update_index(self):
+        """
+        把索引覆盖范围之后的日志行补入索引（调用方持有_index_lock）
+
+        首次调用时即扫描整个日志；文件变短（被截断或轮转）时重建索引。
+        末尾尚未写完的半行不计入，留待下次补扫描
+        """
+        try:
+            size = os.stat(self.log_file).st_size
+        except FileNotFoundError:
+            self._reset_index()
+            self._index_built = True
+            return
+
+        if size < self._indexed_size:
+            self._reset_index()
+
+        if size > self._indexed_size:
+            offset = self._indexed_size
+            with open(self.log_file, 'rb') as f:
+                f.seek(offset)
+                for line in f:
+                    if not line.endswith(b'\n'):
+                        break
+                    try:
+                        data = json_loads(line)
+                        self._index_line(offset, data["event"], data["stage"], data["request_id"])
+                    except Exception:
+                        pass
+                    offset += len(line)
+            self._indexed_size = offset
+
+        self._index_built = True
+
+    def _matching_offsets(self,
+                          event_type: Optional[TelemetryEvent],
+                          stage: Optional[TelemetryStage],
+                          request_id: Optional[str]) -> List[int]:
+        """按过滤条件求命中行的偏移（按文件顺序）"""
+        with self._index_lock:
+            self._update_index()
+
+            candidates = []
+            if request_id:
+                candidates.append(self._offsets_by_request.get(request_id, []))
+            if event_type:
+                candidates.append(self._offsets_by_event.get(_enum_value(event_type), []))
+            if stage:
+                candidates.append(self._offsets_by_stage.get(_enum_value(stage), []))
+
+            # 从最短的偏移列表出发，一次集合运算与其余条件求交集，再按文件顺序输出
+            candidates.sort(key=len)
+            shortest = candidates[0]
+            if len(candidates) == 1:
+                return list(shortest)
+            common = set(shortest).intersection(*candidates[1:])
+            return [offset for offset in shortest if offset in common]
+
+    def flush(self):
+        """等待已入队的事件全部写入文件"""
+        if self._writer.is_alive():
+            self._queue.join()
+
+    def close(self):
+        """写完剩余事件并停止后台写入线程"""
+        if self._writer.is_alive():
+            self._queue.put(None)
+            self._writer.join()
+
     def log_event(self,
                   stage: TelemetryStage,
                   event: TelemetryEvent,
@@ -102,105 +334,178 @@ class TelemetryLogger:
             生成的request_id
         """
         if request_id is None:
-            request_id = str(uuid.uuid4())
+            request_id = fast_uuid4()
 
         # 生成查询+计划的哈希
-        hash_content = f"{user_query}|{json.dumps(plan_excerpt or {}, sort_keys=True)}"
-        content_hash = hashlib.sha256(hash_content.encode()).hexdigest()[:16]
-
-        # 创建记录
-        record = TelemetryRecord(
-            ts=datetime.now(timezone.utc).isoformat(),
-            request_id=request_id,
-            stage=stage,
-            event=event,
-            user_query=user_query,
-            context=context or {},
-            plan_excerpt=plan_excerpt or {},
-            artifacts_excerpt=artifacts_excerpt or {},
-            limits=limits or {},
-            model=model or {},
-            hash=content_hash
-        )
-
-        # 线程安全写入
-        with self._lock:
+        content_hash = _content_hash(f"{user_query}|{_plan_json(plan_excerpt)}")
+
+        # 填充线程内复用的记录字典（写入路径不构造TelemetryRecord，读取时才校验）
+        record = _record_buffer()
+        record["ts"] = datetime.now(timezone.utc).isoformat()
+        record["request_id"] = request_id
+        # str枚举成员序列化时直接输出为字符串值，无需取.value
+        record["stage"] = stage
+        record["event"] = event
+        record["user_query"] = user_query
+        record["context"] = context or {}
+        record["plan_excerpt"] = plan_excerpt or {}
+        record["artifacts_excerpt"] = artifacts_excerpt or {}
+        record["limits"] = limits or {}
+        record["model"] = model or {}
+        record["hash"] = content_hash
+        try:
+            line = json_dumps(record)
+        except Exception:
+            # 上下文等字段含不可序列化的值时转为字符串，telemetry失败不影响调用方
             try:
-                with open(self.log_file, 'a', encoding='utf-8') as f:
-                    f.write(record.to_jsonl() + '\n')
-                    f.flush()
+                line = json.dumps(record, ensure_ascii=False, default=str).encode('utf-8')
+            except Exception as e:
+                logger.error(f"写入telemetry日志失败: {e}")
+                return request_id
 
-                # 更新统计信息
-                self.stats["total_events"] += 1
-                self.stats["events_by_type"][event] = self.stats["events_by_type"].get(event, 0) + 1
-                self.stats["events_by_stage"][stage] = self.stats["events_by_stage"].get(stage, 0) + 1
+        # 交给后台线程写入，调用方不等待文件IO；写线程已退出时同步写入，不往无人消费的队列里堆积
+        if self._writer.is_alive():
+            self._queue.put((line + b'\n', event, stage, request_id))
+        elif not self._write_direct(line + b'\n'):
+            return request_id
 
-                logger.debug(f"Telemetry事件已记录: {stage.value}/{event.value}")
+        # 更新统计信息
+        stats = self.stats
+        with self._lock:
+            stats["total_events"] += 1
+            stats["events_by_type"][event] += 1
+            stats["events_by_stage"][stage] += 1
 
-            except Exception as e:
-                logger.error(f"写入telemetry日志失败: {e}")
+        logger.debug(f"Telemetry事件已记录: {stage.value}/{event.value}")
 
         return request_id
 
     def get_stats(self) -> Dict[str, Any]:
         """获取统计信息"""
         with self._lock:
-            return self.stats.copy()
-
-    def search_events(self,
-                     event_type: Optional[TelemetryEvent] = None,
-                     stage: Optional[TelemetryStage] = None,
-                     request_id: Optional[str] = None,
-                     limit: int = 100) -> List[TelemetryRecord]:
+            return {
+                "total_events": self.stats["total_events"],
+                "events_by_type": self.stats["events_by_type"].copy(),
+                "events_by_stage": self.stats["events_by_stage"].copy()
+            }
+
+    def iter_events(self,
+                    event_type: Optional[TelemetryEvent] = None,
+                    stage: Optional[TelemetryStage] = None,
+                    request_id: Optional[str] = None) -> Iterator[TelemetryRecord]:
         """
-        搜索telemetry事件
+        逐条产出匹配的telemetry事件，不把整个日志加载到内存
 
         Args:
             event_type: 事件类型过滤
             stage: 阶段过滤
             request_id: 请求ID过滤
-            limit: 返回记录数量限制
 
-        Returns:
-            匹配的记录列表
+        Yields:
+            匹配的记录
         """
-        results = []
+        # 先让后台线程写完积压事件，保证能读到刚记录的事件
+        self.flush()
+
+        # 带过滤条件时走偏移索引，只解析命中的行
+        if event_type or stage or request_id:
+            yield from self._iter_indexed(event_type, stage, request_id)
+            return
 
         try:
             with open(self.log_file, 'r', encoding='utf-8') as f:
                 for line in f:
-                    if len(results) >= limit:
-                        break
-
                     try:
-                        data = json.loads(line.strip())
+                        data = json_loads(line)
                         record = TelemetryRecord(**data)
+                    except Exception as e:
+                        logger.warning(f"解析telemetry记录失败: {e}")
+                        continue
 
-                        # 应用过滤条件
-                        if event_type and record.event != event_type:
-                            continue
-                        if stage and record.stage != stage:
-                            continue
-                        if request_id and record.request_id != request_id:
-                            continue
+                    # 应用过滤条件
+                    if event_type and record.event != event_type:
+                        continue
+                    if stage and record.stage != stage:
+                        continue
+                    if request_id and record.request_id != request_id:
+                        continue
 
-                        results.append(record)
+                    yield record
 
+        except FileNotFoundError:
+            logger.warning(f"Telemetry日志文件不存在: {self.log_file}")
+        except Exception as e:
+            logger.error(f"读取telemetry日志失败: {e}")
+
+    def _iter_indexed(self,
+                      event_type: Optional[TelemetryEvent],
+                      stage: Optional[TelemetryStage],
+                      request_id: Optional[str]) -> Iterator[TelemetryRecord]:
+        """按索引偏移定位并解析匹配的记录"""
+        offsets = self._matching_offsets(event_type, stage, request_id)
+        if not offsets:
+            return
+
+        try:
+            with open(self.log_file, 'rb') as f:
+                for offset in offsets:
+                    f.seek(offset)
+                    try:
+                        record = TelemetryRecord.model_validate_json(f.readline())
                     except Exception as e:
                         logger.warning(f"解析telemetry记录失败: {e}")
                         continue
+                    yield record
 
         except FileNotFoundError:
             logger.warning(f"Telemetry日志文件不存在: {self.log_file}")
         except Exception as e:
             logger.error(f"读取telemetry日志失败: {e}")
 
-        return results
+    def search_events(self,
+                     event_type: Optional[TelemetryEvent] = None,
+                     stage: Optional[TelemetryStage] = None,
+                     request_id: Optional[str] = None,
+                     limit: int = 100) -> List[TelemetryRecord]:
+        """
+        搜索telemetry事件
+
+        Args:
+            event_type: 事件类型过滤
+            stage: 阶段过滤
+            request_id: 请求ID过滤
+            limit: 返回记录数量限制
+
+        Returns:
+            匹配的记录列表
+        """
+        self.flush()
+        try:
+            st = os.stat(self.log_file)
+        except FileNotFoundError:
+            return list(islice(self.iter_events(event_type, stage, request_id), limit))
+
+        # 返回副本，避免调用方修改缓存内容
+        return list(self._search_cached(event_type, stage, request_id, limit, st.st_mtime_ns, st.st_size))
+
+    def _search_uncached(self,
+                         event_type: Optional[TelemetryEvent],
+                         stage: Optional[TelemetryStage],
+                         request_id: Optional[str],
+                         limit: int,
+                         mtime_ns: int,
+                         size: int) -> tuple:
+        """扫描日志文件搜索事件（mtime_ns/size仅作为缓存键）"""
+        return tuple(islice(self.iter_events(event_type, stage, request_id), limit))
 
     def get_request_events(self, request_id: str) -> List[TelemetryRecord]:
         """获取特定请求的所有事件"""
         return self.search_events(request_id=request_id, limit=1000)
 
+    def iter_request_events(self, request_id: str, limit: int = 1000) -> Iterator[TelemetryRecord]:
+        """逐条产出特定请求的事件"""
+        return islice(self.iter_events(request_id=request_id), limit)
+
 
 # 全局telemetry实例
 _telemetry_instance = None
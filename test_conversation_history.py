@@ -4,34 +4,39 @@
 """
 
 from orchestrator.orchestrator import SessionState, ConversationMessage
+from logger import get_logger
+
+logger = get_logger()
+
 
 def test_conversation_history():
     """测试对话历史管理"""
-    print("🗣️ 测试对话历史管理功能...")
-
     # 创建会话状态
     session = SessionState()
 
     # 添加一些对话消息
-    session.add_message("user", "帮我查下明天天气")
-    session.add_message("assistant", "好的，请告诉我您想查询哪个城市的天气？")
-    session.add_message("user", "北京")
-    session.add_message("assistant", "北京明天天气：晴天，温度15-25℃")
-    session.add_message("user", "谢谢")
-    session.add_message("assistant", "不客气，有什么其他问题吗？")
-
-    print(f"✅ 对话历史记录数: {len(session.conversation_history)}")
+    session.extend_messages([
+        ("user", "帮我查下明天天气"),
+        ("assistant", "好的，请告诉我您想查询哪个城市的天气？"),
+        ("user", "北京"),
+        ("assistant", "北京明天天气：晴天，温度15-25℃"),
+        ("user", "谢谢"),
+        ("assistant", "不客气，有什么其他问题吗？"),
+    ])
+
+    assert len(session.conversation_history) == 6
+    logger.debug(f"对话历史记录数: {len(session.conversation_history)}")
 
     # 测试获取最近消息
     recent = session.get_recent_messages(3)
-    print(f"✅ 最近3条消息:")
-    for msg in recent:
-        role_name = "用户" if msg.role == "user" else "助手"
-        print(f"  {role_name}: {msg.content}")
+    assert [msg.content for msg in recent] == ["北京明天天气：晴天，温度15-25℃", "谢谢", "不客气，有什么其他问题吗？"]
+    logger.debug(f"最近3条消息: {[msg.to_dict() for msg in recent]}")
 
-    # 测试对话上下文摘要
+    # 测试对话上下文摘要（最近5条）
     context = session.get_conversation_context()
-    print(f"✅ 对话上下文摘要:\n{context}")
+    assert context.splitlines()[0] == "助手: 好的，请告诉我您想查询哪个城市的天气？"
+    assert len(context.splitlines()) == 5
+    logger.debug(f"对话上下文摘要:\n{context}")
 
     # 测试用户偏好
     session.set_user_preference("default_city", "北京")
@@ -40,9 +45,10 @@ def test_conversation_history():
     city = session.get_user_preference("default_city")
     unit = session.get_user_preference("temperature_unit")
 
-    print(f"✅ 用户偏好: 城市={city}, 温度单位={unit}")
+    assert (city, unit) == ("北京", "celsius")
+    logger.debug(f"用户偏好: 城市={city}, 温度单位={unit}")
 
-    print("✅ 对话历史管理功能测试通过！")
 
 if __name__ == "__main__":
     test_conversation_history()
+    print("✅ 对话历史管理功能测试通过！")
@@ -5,6 +5,9 @@
 并将所有日志输出到文件
 """
 import asyncio
+import atexit
+import queue
+import reprlib
 import sys
 import os
 from datetime import datetime
@@ -13,10 +16,10 @@ from pathlib import Path
 # 添加项目根目录到路径
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from agent_core import create_agent_core_with_llm
 from config import get_config
 from logger import setup_logging
 import logging
+from logging.handlers import QueueHandler, QueueListener
 
 # 设置日志输出到文件和控制台
 def setup_test_logging(log_file):
@@ -45,13 +48,64 @@ def setup_test_logging(log_file):
     )
     console_handler.setFormatter(console_formatter)
 
-    # 添加handler
-    logger.addHandler(file_handler)
-    logger.addHandler(console_handler)
+    # 日志记录只入队，由后台线程写文件和控制台，避免阻塞事件循环
+    log_queue = queue.SimpleQueue()
+    listener = QueueListener(log_queue, file_handler, console_handler, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+
+    logger.addHandler(QueueHandler(log_queue))
 
     return logger
 
 
+# 工具结果只记录有限长度的repr，避免为大结果先生成完整字符串
+_RESULT_REPR = reprlib.Repr()
+_RESULT_REPR.maxstring = 200
+_RESULT_REPR.maxother = 200
+
+# 续跑阶段遇到这些事件即结束
+_FOLLOWUP_STOP_EVENTS = frozenset(("final", "error", "ask_user"))
+
+
+def _handle_event(logger, event, event_count, prefix=""):
+    """
+    记录一个流式事件（主查询和续跑共用）
+
+    Args:
+        logger: 日志器
+        event: 流式事件
+        event_count: 事件序号
+        prefix: 日志前缀（续跑时为"续跑"）
+
+    Returns:
+        (事件类型, 需要追加到响应的内容)
+    """
+    event_type = event.get("type", "unknown")
+    logger.info(f"[{prefix}事件 {event_count}] 类型: {event_type}")
+
+    content = ""
+    if event_type == "content":
+        content = event.get("content", "")
+        logger.debug("%s内容片段: %s...", prefix, content[:100])
+    elif event_type == "status":
+        logger.info(f"{prefix}状态: {event.get('message', '')}")
+    elif event_type == "tool_result":
+        result = _RESULT_REPR.repr(event.get("result", ""))
+        logger.info(f"{prefix}工具结果: {event.get('tool_name', '')} -> {result}")
+    elif event_type == "final":
+        logger.info(f"{prefix}最终结果: {event.get('response', '')[:200]}...")
+        logger.info(f"{prefix}元数据: {event.get('metadata', {})}")
+    elif event_type == "error":
+        logger.error("%s错误: %s", prefix, event.get('error', ''))
+    elif event_type == "ask_user":
+        logger.info(f"{prefix}需要用户输入: {event.get('question', '')}")
+    else:
+        logger.debug("%s其他事件: %s", prefix, event)
+
+    return event_type, content
+
+
 async def run_test_query():
     """运行测试查询"""
     # 设置输出目录（按时间戳创建子目录）
@@ -75,8 +129,9 @@ async def run_test_query():
         config = get_config()
         logger.info(f"配置加载完成: M3={config.use_m3_orchestrator}, RAG={config.rag_enabled}")
 
-        # 创建Agent实例
+        # 创建Agent实例（在此处导入，避免pytest收集本文件时加载LLM客户端）
         logger.info("创建 Agent 实例...")
+        from agent_core import create_agent_core_with_llm
         agent = create_agent_core_with_llm(use_m3=True)
         logger.info("Agent 初始化完成")
 
@@ -97,31 +152,10 @@ async def run_test_query():
 
         async for event in agent.process_stream(query):
             event_count += 1
-            event_type = event.get("type", "unknown")
-            logger.info(f"[事件 {event_count}] 类型: {event_type}")
-
-            if event_type == "content":
-                content = event.get("content", "")
-                full_response += content
-                logger.debug(f"内容片段: {content[:100]}...")
-            elif event_type == "status":
-                status_msg = event.get("message", "")
-                logger.info(f"状态: {status_msg}")
-            elif event_type == "tool_result":
-                tool_name = event.get("tool_name", "")
-                result = str(event.get("result", ""))[:200]
-                logger.info(f"工具结果: {tool_name} -> {result}...")
-            elif event_type == "final":
-                final_response = event.get("response", "")
-                metadata = event.get("metadata", {})
-                logger.info(f"最终结果: {final_response[:200]}...")
-                logger.info(f"元数据: {metadata}")
-            elif event_type == "error":
-                error_msg = event.get("error", "")
-                logger.error(f"错误: {error_msg}")
-            elif event_type == "ask_user":
-                question = event.get("question", "")
-                logger.info(f"需要用户输入: {question}")
+            event_type, content = _handle_event(logger, event, event_count)
+            full_response += content
+
+            if event_type == "ask_user":
                 logger.info(f"模拟用户回答: {user_answer}")
                 ask_user_encountered = True
 
@@ -137,42 +171,14 @@ async def run_test_query():
                 logger.info("开始续跑执行...")
                 async for followup_event in agent.process_stream(enhanced_query):
                     event_count += 1
-                    followup_event_type = followup_event.get("type", "unknown")
-                    logger.info(f"[续跑事件 {event_count}] 类型: {followup_event_type}")
-
-                    if followup_event_type == "content":
-                        content = followup_event.get("content", "")
-                        full_response += content
-                        logger.debug(f"续跑内容片段: {content[:100]}...")
-                    elif followup_event_type == "status":
-                        status_msg = followup_event.get("message", "")
-                        logger.info(f"续跑状态: {status_msg}")
-                    elif followup_event_type == "tool_result":
-                        tool_name = followup_event.get("tool_name", "")
-                        result = str(followup_event.get("result", ""))[:200]
-                        logger.info(f"续跑工具结果: {tool_name} -> {result}...")
-                    elif followup_event_type == "final":
-                        final_response = followup_event.get("response", "")
-                        metadata = followup_event.get("metadata", {})
-                        logger.info(f"续跑最终结果: {final_response[:200]}...")
-                        logger.info(f"续跑元数据: {metadata}")
-                        break  # 续跑完成
-                    elif followup_event_type == "error":
-                        error_msg = followup_event.get("error", "")
-                        logger.error(f"续跑错误: {error_msg}")
-                        break
-                    elif followup_event_type == "ask_user":
-                        # 续跑中再次遇到ask_user，记录但不处理
-                        question = followup_event.get("question", "")
-                        logger.info(f"续跑中再次遇到ask_user: {question}")
-                        logger.info("续跑结束，避免无限循环")
+                    followup_event_type, content = _handle_event(logger, followup_event, event_count, prefix="续跑")
+                    full_response += content
+
+                    # 续跑在最终结果、错误或再次遇到ask_user时结束（避免无限循环）
+                    if followup_event_type in _FOLLOWUP_STOP_EVENTS:
                         break
-                    else:
-                        logger.debug(f"续跑其他事件: {followup_event}")
 
                 break  # 主循环结束，因为已经处理了续跑
-            else:
-                logger.debug(f"其他事件: {event}")
 
         # 记录结束时间
         end_time = datetime.now()
@@ -188,15 +194,18 @@ async def run_test_query():
         # 保存最终结果到单独的文件
         result_file = output_dir / f"query_result_{timestamp}.txt"
         with open(result_file, 'w', encoding='utf-8') as f:
-            f.write("查询测试结果\n")
-            f.write("=" * 30 + "\n")
-            f.write(f"查询: {query}\n")
-            f.write(f"开始时间: {start_time}\n")
-            f.write(f"结束时间: {end_time}\n")
-            f.write(f"总耗时: {duration:.2f}秒\n")
-            f.write(f"事件数: {event_count}\n")
-            f.write("\n最终响应:\n")
-            f.write("-" * 20 + "\n")
+            f.writelines([
+                "查询测试结果\n",
+                "=" * 30 + "\n",
+                f"查询: {query}\n",
+                f"开始时间: {start_time}\n",
+                f"结束时间: {end_time}\n",
+                f"总耗时: {duration:.2f}秒\n",
+                f"事件数: {event_count}\n",
+                "\n最终响应:\n",
+                "-" * 20 + "\n",
+            ])
+            # 响应可能很长，单独写入以免再拼接一次
             f.write(full_response)
             f.write("\n" + "=" * 50 + "\n")
 
@@ -209,7 +218,7 @@ async def run_test_query():
         print("=" * 50)
 
     except Exception as e:
-        logger.error(f"测试过程中发生错误: {e}", exc_info=True)
+        logger.exception("测试过程中发生错误: %s", e)
         print(f"❌ 测试失败: {e}")
         return False
 
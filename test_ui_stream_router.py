@@ -1,10 +1,15 @@
 import pytest
 
-from ui_gradio import ChatUI
 
+@pytest.fixture(scope="module")
+def ui():
+    """模块内共用一个ChatUI实例；gradio在用到时才导入，未安装时跳过"""
+    pytest.importorskip("gradio")
+    from ui_gradio import ChatUI
+    return ChatUI()
 
-def test_route_stream_event_assistant_content():
-    ui = ChatUI()
+
+def test_route_stream_event_assistant_content(ui):
     chunk = {"type": "assistant_content", "content": "Hello"}
     routed = ui._route_stream_event(chunk)
     assert routed["chat_append"] == "Hello"
@@ -12,16 +17,14 @@ def test_route_stream_event_assistant_content():
     assert routed["error_text"] is None
 
 
-def test_route_stream_event_status():
-    ui = ChatUI()
+def test_route_stream_event_status(ui):
     chunk = {"type": "status", "message": "规划中"}
     routed = ui._route_stream_event(chunk)
     assert routed["chat_append"] is None
     assert "规划中" in routed["status_text"]
 
 
-def test_route_stream_event_error():
-    ui = ChatUI()
+def test_route_stream_event_error(ui):
     chunk = {"type": "error", "message": "失败"}
     routed = ui._route_stream_event(chunk)
     assert routed["chat_append"] is None
@@ -29,8 +32,7 @@ def test_route_stream_event_error():
     assert routed["error_text"] == "失败"
 
 
-def test_route_stream_event_compat_content():
-    ui = ChatUI()
+def test_route_stream_event_compat_content(ui):
     chunk = {"type": "content", "content": "Legacy"}
     routed = ui._route_stream_event(chunk)
     assert routed["chat_append"] == "Legacy"
@@ -3,13 +3,17 @@
 统一管理所有工具的注册、加载和调用
 """
 
+import asyncio
+import concurrent.futures
 import importlib
 import inspect
-from typing import Dict, Any, List, Protocol, Union
-from pathlib import Path
+import os
+import threading
+from typing import Callable, Dict, Any, List, Optional, Protocol, Tuple, Union
 
 from config import get_config
 from logger import get_logger
+from tools import REGISTRY as TOOL_REGISTRY
 
 logger = get_logger()
 
@@ -34,35 +38,84 @@ class Tool(Protocol):
         ...
 
 
+# 各工具的执行超时时间（秒），未列出的工具使用默认值
+_DEFAULT_TOOL_TIMEOUT = 10.0
+_TOOL_TIMEOUTS: Dict[str, float] = {
+    "weather_get": 15.0,     # 天气查询15秒
+    "time_now": 5.0,         # 时间查询5秒
+    "file_read": 10.0,       # 文件读取10秒
+    "fs_write": 10.0,        # 文件写入10秒
+    "date_normalize": 3.0,   # 日期归一化3秒
+    "calendar_read": 8.0,    # 日程读取8秒
+    "email_list": 12.0,      # 邮件查询12秒
+    "math_calc": 3.0,        # 数学计算3秒
+}
+
+# 错误信息中包含这些关键词时视为可重试
+_RETRYABLE_KEYWORDS = ("network", "timeout")
+
+# 工具超时或失败时返回的错误信息
+_TOOL_TIMEOUT_MESSAGES: Dict[str, str] = {
+    "weather_get": "天气查询超时，无法获取天气信息",
+    "time_now": "时间查询超时，无法获取当前时间",
+    "file_read": "文件读取超时，无法获取文件内容",
+    "fs_write": "文件写入超时，无法写入文件",
+    "calendar_read": "日程查询超时，无法获取日程信息",
+    "email_list": "邮件查询超时，无法获取邮件列表",
+    "math_calc": "数学计算超时，无法计算结果",
+}
+
+
+def _build_openai_def(tool: Tool) -> Dict[str, Any]:
+    """生成单个工具的OpenAI函数定义"""
+    return {
+        "type": "function",
+        "function": {
+            "name": tool.name,
+            "description": tool.description,
+            "parameters": tool.parameters
+        }
+    }
+
+
 def to_openai_tools(tools: List[Tool]) -> List[Dict[str, Any]]:
     """
     将工具转换为OpenAI格式
 
+    工具元数据注册后不再变化，对 get_tools() 缓存的工具列表复用上次的转换结果
+    （调用方不应修改返回的列表）
+
     Args:
         tools: 工具列表
 
     Returns:
         OpenAI格式的工具列表
     """
-    openai_tools = []
-
-    for tool in tools:
-        tool_def = {
-            "type": "function",
-            "function": {
-                "name": tool.name,
-                "description": tool.description,
-                "parameters": tool.parameters
-            }
-        }
-        openai_tools.append(tool_def)
+    global _openai_tools_cache
+
+    cacheable = tools is _cached_tools
+    if cacheable and _openai_tools_cache[0] == _tools_version:
+        return _openai_tools_cache[1]
+
+    # load_tools 注册的工具已预先生成定义，其他工具现场生成
+    openai_tools = [getattr(tool, "_openai_def", None) or _build_openai_def(tool) for tool in tools]
 
+    if cacheable:
+        _openai_tools_cache = (_tools_version, openai_tools)
     return openai_tools
 
 
+def _import_tool_module(module_name: str):
+    """导入工具模块，返回 (模块, 异常)，异常留给调用方按顺序记录"""
+    try:
+        return importlib.import_module(module_name), None
+    except Exception as e:
+        return None, e
+
+
 def load_tools(whitelist: List[str] = None) -> List[Tool]:
     """
-    从tools/目录动态加载工具
+    按 tools.REGISTRY 静态清单加载工具
 
     Args:
         whitelist: 白名单工具名称列表，如果为None则加载所有工具
@@ -71,202 +124,53 @@ def load_tools(whitelist: List[str] = None) -> List[Tool]:
         工具实例列表
     """
     tools = []
-    tools_dir = Path(__file__).parent / "tools"
+    module_names = [module_name for module_name, _ in TOOL_REGISTRY]
 
-    if not tools_dir.exists():
-        logger.warning(f"工具目录不存在: {tools_dir}")
-        return tools
+    # 并发导入工具模块（读盘、编译和模块初始化互不依赖），实例化仍按顺序进行
+    with concurrent.futures.ThreadPoolExecutor(max_workers=8, thread_name_prefix="tool-import") as pool:
+        imported = list(pool.map(_import_tool_module, module_names))
 
-    # 遍历tools目录中的Python文件
-    for py_file in tools_dir.glob("tool_*.py"):
-        module_name = py_file.stem  # tool_weather -> tool_weather
+    for (module_name, class_name), (module, import_error) in zip(TOOL_REGISTRY, imported):
+        if import_error is not None:
+            logger.error(f"加载工具模块失败 {module_name}: {import_error}")
+            continue
 
-        # 跳过空文件或预留的工具文件
-        if py_file.stat().st_size == 0:
-            logger.debug(f"跳过空工具文件: {module_name}")
+        logger.debug(f"加载工具模块: {module_name}")
+        tool_class = getattr(module, class_name, None)
+        if tool_class is None:
+            logger.warning(f"未找到工具类: {module_name}.{class_name}")
             continue
 
         try:
-            # 动态导入模块
-            module = importlib.import_module(f"tools.{module_name}")
-            logger.debug(f"加载工具模块: {module_name}")
-
-            # 查找工具类
-            # 首先尝试标准命名规则（模块名首字母大写）
-            class_name = "".join(word.capitalize() for word in module_name.split("_"))
-
-            # 特殊处理一些不规则的类名
-            special_class_names = {
-                "tool_date_utils": "ToolDateNormalizer",  # 特殊命名
-                "tool_fs_write": "ToolFSWrite",           # 大小写问题
-            }
-
-            # 尝试多个可能的类名
-            possible_class_names = [class_name]
-            if module_name in special_class_names:
-                possible_class_names.insert(0, special_class_names[module_name])
-
-            tool_class = None
-            for candidate_name in possible_class_names:
-                if hasattr(module, candidate_name):
-                    tool_class = getattr(module, candidate_name)
-                    logger.debug(f"找到工具类: {candidate_name}")
-                    break
-
-            if tool_class:
-                try:
-                    tool_instance = tool_class()
-                    tools.append(tool_instance)
-                    logger.info(f"注册工具: {tool_instance.name}")
-                except Exception as e:
-                    logger.error(f"实例化工具失败 {candidate_name}: {e}")
-            else:
-                logger.warning(f"未找到工具类: {module_name} (尝试的类名: {possible_class_names})")
-
+            tool_instance = tool_class()
+            # 注册时判定一次run是否为协程函数、确定超时时间并生成OpenAI定义，使用时不再逐次计算
+            tool_instance._is_async = inspect.iscoroutinefunction(tool_instance.run)
+            tool_instance._timeout = _TOOL_TIMEOUTS.get(tool_instance.name, _DEFAULT_TOOL_TIMEOUT)
+            tool_instance._openai_def = _build_openai_def(tool_instance)
+            tools.append(tool_instance)
+            logger.info(f"注册工具: {tool_instance.name}")
         except Exception as e:
-            logger.error(f"加载工具模块失败 {module_name}: {e}")
-            continue
+            logger.error(f"实例化工具失败 {class_name}: {e}")
 
     # 如果有白名单，则过滤工具
+    # （工具名是实例属性，只能在实例化之后过滤）
     if whitelist:
-        filtered_tools = []
-        whitelist_set = set(whitelist)
-        for tool in tools:
-            if tool.name in whitelist_set:
-                filtered_tools.append(tool)
-        tools = filtered_tools
+        whitelist_set = frozenset(whitelist)
+        tools = [tool for tool in tools if tool.name in whitelist_set]
         logger.info(f"应用白名单过滤，剩余工具: {[t.name for t in tools]}")
 
     return tools
 
 
-def execute_tool(tool_name: str, tools: List[Tool], **kwargs) -> 'StandardToolResult':
-    """
-    执行指定工具
-
-    Args:
-        tool_name: 工具名称
-        tools: 可用工具列表
-        **kwargs: 工具参数
-
-    Returns:
-        标准化的工具结果
-
-    Raises:
-        ToolError: 工具不存在或其他严重错误
-    """
-    from schemas.tool_result import StandardToolResult, ToolError as ToolResultError, create_tool_error, create_tool_meta, ErrorCode
-
-    # 查找工具
-    tool = None
-    for t in tools:
-        if t.name == tool_name:
-            tool = t
-            break
-
-    if tool is None:
-        raise ToolError(tool_name, f"工具不存在", retryable=False)
-
-    try:
-        logger.info(f"执行工具: {tool_name} 参数: {kwargs}")
-
-        # 检查是否是异步方法
-        import asyncio
-        import inspect
-        import time
-
-        start_time = time.time()
-        tool_timeout = self._get_tool_timeout(tool_name)
-
-        if inspect.iscoroutinefunction(tool.run):
-            # 异步方法，需要在事件循环中运行
-            try:
-                loop = asyncio.get_event_loop()
-                if loop.is_running():
-                    # 如果事件循环已经在运行，使用线程池执行
-                    import concurrent.futures
-                    with concurrent.futures.ThreadPoolExecutor() as executor:
-                        future = executor.submit(asyncio.run, tool.run(**kwargs))
-                        result = future.result(timeout=tool_timeout)
-                else:
-                    result = loop.run_until_complete(tool.run(**kwargs))
-            except concurrent.futures.TimeoutError:
-                logger.warning(f"工具 {tool_name} 执行超时 ({tool_timeout}s)")
-                latency_ms = int((time.time() - start_time) * 1000)
-                error = create_tool_error(ErrorCode.INTERNAL, f"工具执行超时 ({tool_timeout}s)", retryable=True)
-                meta = create_tool_meta(tool_name, latency_ms, kwargs)
-                return StandardToolResult.failure(error, meta)
-            except Exception as async_e:
-                logger.warning(f"异步执行失败，尝试同步执行: {async_e}")
-                try:
-                    result = tool.run(**kwargs)
-                except Exception as sync_e:
-                    logger.error(f"同步执行也失败: {sync_e}")
-                    latency_ms = int((time.time() - start_time) * 1000)
-                    error = create_tool_error(ErrorCode.INTERNAL, f"工具执行失败: {str(sync_e)}", retryable=True)
-                    meta = create_tool_meta(tool_name, latency_ms, kwargs)
-                    return StandardToolResult.failure(error, meta)
-        else:
-            # 同步方法，直接调用
-            try:
-                result = tool.run(**kwargs)
-            except Exception as sync_e:
-                logger.error(f"同步工具执行失败: {sync_e}")
-                latency_ms = int((time.time() - start_time) * 1000)
-                error = create_tool_error(ErrorCode.INTERNAL, f"工具执行失败: {str(sync_e)}", retryable=True)
-                meta = create_tool_meta(tool_name, latency_ms, kwargs)
-                return StandardToolResult.failure(error, meta)
-
-        # 检查结果是否已经是StandardToolResult
-        if isinstance(result, StandardToolResult):
-            logger.info(f"工具 {tool_name} 执行成功")
-            return result
-        else:
-            # 如果工具还没有更新为返回StandardToolResult，包装结果
-            logger.warning(f"工具 {tool_name} 返回了非标准格式结果，正在包装")
-            latency_ms = int((time.time() - start_time) * 1000)
-            meta = create_tool_meta(tool_name, latency_ms, kwargs)
-            return StandardToolResult.success({"result": result}, meta)
-
-    except Exception as e:
-        error_msg = f"工具执行失败: {str(e)}"
-        logger.error(f"工具 {tool_name} 执行失败: {error_msg}")
-
-        # 判断是否可重试（网络错误等通常可重试）
-        retryable = "network" in str(e).lower() or "timeout" in str(e).lower()
-        raise ToolError(tool_name, error_msg, retryable=retryable)
-
-    def _get_tool_timeout(self, tool_name: str) -> float:
-        """获取工具的超时时间"""
-        # 为不同工具设置不同的超时时间
-        timeouts = {
-            "weather_get": 15.0,     # 天气查询15秒
-            "time_now": 5.0,         # 时间查询5秒
-            "file_read": 10.0,       # 文件读取10秒
-            "fs_write": 10.0,        # 文件写入10秒
-            "date_normalize": 3.0,   # 日期归一化3秒
-            "calendar_read": 8.0,    # 日程读取8秒
-            "email_list": 12.0,      # 邮件查询12秒
-            "math_calc": 3.0,        # 数学计算3秒
-        }
-        return timeouts.get(tool_name, 10.0)  # 默认10秒
-
-    def _get_tool_timeout_default(self, tool_name: str) -> Any:
-        """获取工具超时的默认返回值"""
-        defaults = {
-            "weather_get": {"error": "天气查询超时，无法获取天气信息"},
-            "time_now": {"error": "时间查询超时，无法获取当前时间"},
-            "file_read": {"error": "文件读取超时，无法获取文件内容"},
-            "fs_write": {"error": "文件写入超时，无法写入文件"},
-            "calendar_read": {"error": "日程查询超时，无法获取日程信息"},
-            "email_list": {"error": "邮件查询超时，无法获取邮件列表"},
-            "math_calc": {"error": "数学计算超时，无法计算结果"},
-        }
-        return defaults.get(tool_name, {"error": f"工具 {tool_name} 执行超时"})
-
-
-# 全局工具实例缓存
+# 全局工具实例缓存及按名称建立的索引
 _cached_tools = None
+_cached_tool_names: Tuple[str, ...] = ()
+_tool_index: Dict[str, Tool] = {}
+# 工具名称 -> 预生成的专用调用函数
+_dispatch_by_name: Dict[str, Callable[..., Any]] = {}
+# 每次重新加载工具缓存时递增，用于使 to_openai_tools 的缓存失效
+_tools_version = 0
+_openai_tools_cache: tuple = (-1, [])
 
 
 def get_tools(whitelist: List[str] = None, use_cache: bool = True) -> List[Tool]:
@@ -274,71 +178,38 @@ def get_tools(whitelist: List[str] = None, use_cache: bool = True) -> List[Tool]
     获取工具实例（带缓存）
 
     Args:
-        whitelist: 白名单工具列表
+        whitelist: 白名单
         use_cache: 是否使用缓存
 
     Returns:
         工具实例列表
     """
-    global _cached_tools
+    global _cached_tools, _cached_tool_names, _tool_index, _dispatch_by_name, _tools_version
 
-    if not use_cache or _cached_tools is None:
-        _cached_tools = _load_tools(whitelist)
+    if use_cache and _cached_tools is not None:
+        return _cached_tools
 
+    _cached_tools = load_tools(whitelist)
+    _tool_index = {tool.name: tool for tool in _cached_tools}
+    _dispatch_by_name = {tool.name: _make_dispatcher(tool) for tool in _cached_tools}
+    _cached_tool_names = tuple(tool.name for tool in _cached_tools)
+    _tools_version += 1
     return _cached_tools
 
 
-def _load_tools(whitelist: List[str] = None) -> List[Tool]:
-    """加载工具实例"""
-    tools = []
+def get_tool_index() -> Dict[str, Tool]:
+    """获取工具名称到实例的索引（与 get_tools() 的缓存同步更新）"""
+    get_tools()
+    return _tool_index
 
-    # 动态导入工具模块
-    tool_modules = [
-        "tools.tool_weather",
-        "tools.tool_time",
-        "tools.tool_calendar",
-        "tools.tool_email",
-        "tools.tool_file_reader",
-        "tools.tool_file_writer",
-        "tools.tool_fs_write",
-        "tools.tool_math",
-        "tools.tool_websearch",
-        "tools.tool_date_utils",
-        "tools.tool_ask_user",
-    ]
-
-    for module_name in tool_modules:
-        try:
-            logger.debug(f"加载工具模块: {module_name}")
-            module = __import__(module_name, fromlist=["ToolWeather", "ToolTime", "ToolCalendar", "ToolEmail", "ToolFileReader", "ToolFileWriter", "ToolFSWrite", "ToolMath", "ToolWebSearch", "ToolDateNormalizer", "ToolAskUser"])
-
-            # 获取工具类
-            tool_classes = []
-            for attr_name in dir(module):
-                attr = getattr(module, attr_name)
-                if (isinstance(attr, type) and
-                    hasattr(attr, 'name') and
-                    hasattr(attr, 'run')):
-                    tool_classes.append(attr)
-
-            # 实例化工具
-            for tool_class in tool_classes:
-                try:
-                    if whitelist and tool_class.name not in whitelist:
-                        continue
-
-                    tool_instance = tool_class()
-                    tools.append(tool_instance)
-                    logger.info(f"注册工具: {tool_class.name}")
-                except Exception as e:
-                    logger.warning(f"实例化工具 {tool_class.__name__} 失败: {e}")
-
-        except ImportError as e:
-            logger.warning(f"导入工具模块 {module_name} 失败: {e}")
-        except Exception as e:
-            logger.error(f"加载工具模块 {module_name} 时发生错误: {e}")
 
-    return tools
+def _find_tool(tool_name: str, tools: Union[List[Tool], Dict[str, Tool]]) -> Union[Tool, None]:
+    """按名称查找工具，缓存的工具列表和索引走字典查找，其他列表退回线性扫描"""
+    if isinstance(tools, dict):
+        return tools.get(tool_name)
+    if tools is _cached_tools:
+        return _tool_index.get(tool_name)
+    return next((t for t in tools if t.name == tool_name), None)
 
 
 # 创建全局执行器实例
@@ -368,134 +239,142 @@ def execute_tool(tool_name: str, tools: List[Tool], **kwargs) -> Any:
     return get_executor().execute_tool(tool_name, tools, **kwargs)
 
 
+# 异步工具统一在一个常驻的后台事件循环中执行（首次使用时启动）
+_bg_loop: Optional[asyncio.AbstractEventLoop] = None
+_bg_loop_lock = threading.Lock()
+
+
+def _reset_after_fork():
+    """子进程中后台线程不复存在，丢弃继承来的事件循环，下次使用时重新启动"""
+    global _bg_loop, _bg_loop_lock
+    _bg_loop = None
+    _bg_loop_lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def _get_background_loop() -> asyncio.AbstractEventLoop:
+    """获取（必要时启动）运行异步工具的后台事件循环"""
+    global _bg_loop
+    if _bg_loop is None:
+        with _bg_loop_lock:
+            if _bg_loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="tool-async-loop", daemon=True).start()
+                _bg_loop = loop
+    return _bg_loop
+
+
+def _is_async_tool(tool: Tool) -> bool:
+    """工具的run是否为协程函数（优先使用注册时缓存的结果）"""
+    is_async = getattr(tool, "_is_async", None)
+    if is_async is None:
+        is_async = inspect.iscoroutinefunction(tool.run)
+    return is_async
+
+
+def _get_tool_timeout(tool_name: str) -> float:
+    """获取工具的超时时间"""
+    return _TOOL_TIMEOUTS.get(tool_name, _DEFAULT_TOOL_TIMEOUT)
+
+
+def _get_tool_timeout_default(tool_name: str) -> Any:
+    """获取工具超时的默认返回值（返回副本，调用方可自由修改）"""
+    message = _TOOL_TIMEOUT_MESSAGES.get(tool_name) or f"工具 {tool_name} 执行超时"
+    return {"error": message}
+
+
+def _make_dispatcher(tool: Tool) -> Callable[..., Any]:
+    """
+    为工具生成专用的调用函数
+
+    异步标记、超时时间和run方法在生成时确定并绑定到闭包中，调用时不再逐次判断
+    """
+    tool_name = tool.name
+    run = tool.run
+    tool_timeout = getattr(tool, "_timeout", None) or _get_tool_timeout(tool_name)
+
+    if not _is_async_tool(tool):
+        def dispatch_sync(**kwargs):
+            try:
+                return run(**kwargs)
+            except Exception as sync_e:
+                logger.error(f"同步工具执行失败: {sync_e}")
+                return _get_tool_timeout_default(tool_name)
+
+        return dispatch_sync
+
+    def dispatch_async(**kwargs):
+        # 提交到后台事件循环执行（调用方是否处于运行中的事件循环都同样处理）
+        future = asyncio.run_coroutine_threadsafe(run(**kwargs), _get_background_loop())
+        try:
+            return future.result(timeout=tool_timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            logger.warning(f"工具 {tool_name} 执行超时 ({tool_timeout}s)")
+            return _get_tool_timeout_default(tool_name)
+        except Exception as async_e:
+            logger.warning(f"异步执行失败，尝试同步执行: {async_e}")
+            try:
+                return run(**kwargs)
+            except Exception as sync_e:
+                logger.error(f"同步执行也失败: {sync_e}")
+                return _get_tool_timeout_default(tool_name)
+
+    return dispatch_async
+
+
+def _find_dispatcher(tool_name: str, tools: Union[List[Tool], Dict[str, Tool]]) -> Optional[Callable[..., Any]]:
+    """查找工具的调用函数，缓存的工具列表和索引直接使用预生成的结果"""
+    if tools is _cached_tools or tools is _tool_index:
+        return _dispatch_by_name.get(tool_name)
+    tool = _find_tool(tool_name, tools)
+    return _make_dispatcher(tool) if tool is not None else None
+
+
 class ToolExecutor:
     """工具执行器"""
 
-    def execute_tool(self, tool_name: str, tools: List[Tool], **kwargs) -> Any:
+    def execute_tool(self, tool_name: str, tools: Union[List[Tool], Dict[str, Tool]], **kwargs) -> Any:
         """
         执行工具
 
         Args:
             tool_name: 工具名称
-            tools: 工具列表
+            tools: 工具列表，或 get_tool_index() 返回的名称索引
             **kwargs: 工具参数
 
         Returns:
             工具执行结果
         """
-        tool = None
-        for t in tools:
-            if t.name == tool_name:
-                tool = t
-                break
+        dispatch = _find_dispatcher(tool_name, tools)
 
-        if tool is None:
+        if dispatch is None:
             raise ToolError(tool_name, f"工具不存在", retryable=False)
 
         try:
             logger.info(f"执行工具: {tool_name} 参数: {kwargs}")
-
-            # 检查是否是异步方法
-            import asyncio
-            import inspect
-
-            # 为不同工具设置不同的超时时间
-            tool_timeout = self._get_tool_timeout(tool_name)
-
-            if inspect.iscoroutinefunction(tool.run):
-                # 异步方法，需要在事件循环中运行
-                try:
-                    loop = asyncio.get_event_loop()
-                    if loop.is_running():
-                        # 如果事件循环已经在运行，使用线程池执行
-                        import concurrent.futures
-                        with concurrent.futures.ThreadPoolExecutor() as executor:
-                            future = executor.submit(asyncio.run, tool.run(**kwargs))
-                            result = future.result(timeout=tool_timeout)
-                    else:
-                        result = loop.run_until_complete(tool.run(**kwargs))
-                except concurrent.futures.TimeoutError:
-                    logger.warning(f"工具 {tool_name} 执行超时 ({tool_timeout}s)")
-                    result = self._get_tool_timeout_default(tool_name)
-                except Exception as async_e:
-                    logger.warning(f"异步执行失败，尝试同步执行: {async_e}")
-                    try:
-                        result = tool.run(**kwargs)
-                    except Exception as sync_e:
-                        logger.error(f"同步执行也失败: {sync_e}")
-                        result = self._get_tool_timeout_default(tool_name)
-            else:
-                # 同步方法，直接调用
-                try:
-                    result = tool.run(**kwargs)
-                except Exception as sync_e:
-                    logger.error(f"同步工具执行失败: {sync_e}")
-                    result = self._get_tool_timeout_default(tool_name)
-
+            result = dispatch(**kwargs)
             logger.info(f"工具 {tool_name} 执行成功")
             return result
 
         except Exception as e:
-            error_msg = f"工具执行失败: {str(e)}"
+            detail = str(e)
+            error_msg = f"工具执行失败: {detail}"
             logger.error(f"工具 {tool_name} 执行失败: {error_msg}")
 
             # 判断是否可重试（网络错误等通常可重试）
-            retryable = "network" in str(e).lower() or "timeout" in str(e).lower()
+            detail = detail.lower()
+            retryable = any(keyword in detail for keyword in _RETRYABLE_KEYWORDS)
             raise ToolError(tool_name, error_msg, retryable=retryable)
 
-    def _get_tool_timeout(self, tool_name: str) -> float:
-        """获取工具的超时时间"""
-        # 为不同工具设置不同的超时时间
-        timeouts = {
-            "weather_get": 15.0,     # 天气查询15秒
-            "time_now": 5.0,         # 时间查询5秒
-            "file_read": 10.0,       # 文件读取10秒
-            "fs_write": 10.0,        # 文件写入10秒
-            "date_normalize": 3.0,   # 日期归一化3秒
-            "calendar_read": 8.0,    # 日程读取8秒
-            "email_list": 12.0,      # 邮件查询12秒
-            "math_calc": 3.0,        # 数学计算3秒
-        }
-        return timeouts.get(tool_name, 10.0)  # 默认10秒
-
-    def _get_tool_timeout_default(self, tool_name: str) -> Any:
-        """获取工具超时的默认返回值"""
-        defaults = {
-            "weather_get": {"error": "天气查询超时，无法获取天气信息"},
-            "time_now": {"error": "时间查询超时，无法获取当前时间"},
-            "file_read": {"error": "文件读取超时，无法获取文件内容"},
-            "fs_write": {"error": "文件写入超时，无法写入文件"},
-            "calendar_read": {"error": "日程查询超时，无法获取日程信息"},
-            "email_list": {"error": "邮件查询超时，无法获取邮件列表"},
-            "math_calc": {"error": "数学计算超时，无法计算结果"},
-        }
-        return defaults.get(tool_name, {"error": f"工具 {tool_name} 执行超时"})
-
-
-def get_tools(whitelist: List[str] = None, use_cache: bool = True) -> List[Tool]:
-    """
-    获取工具实例（带缓存）
-
-    Args:
-        whitelist: 白名单
-        use_cache: 是否使用缓存
-
-    Returns:
-        工具实例列表
-    """
-    global _cached_tools
-
-    if use_cache and _cached_tools is not None:
-        return _cached_tools
-
-    _cached_tools = load_tools(whitelist)
-    return _cached_tools
-
 
-def get_tool_names() -> List[str]:
-    """获取所有可用工具名称"""
-    tools = get_tools()
-    return [tool.name for tool in tools]
+def get_tool_names() -> Tuple[str, ...]:
+    """获取所有可用工具名称（与工具缓存一同生成的不可变元组）"""
+    get_tools()
+    return _cached_tool_names
 
 
 if __name__ == "__main__":
@@ -0,0 +1,20 @@
+"""
+工具包
+REGISTRY 为静态工具清单，tool_registry.load_tools 按此顺序导入模块并实例化工具类
+"""
+from typing import List, Tuple
+
+# (模块名, 工具类名)；tool_websearch、tool_rag_search 尚未启用
+REGISTRY: List[Tuple[str, str]] = [
+    ("tools.tool_weather", "ToolWeather"),
+    ("tools.tool_time", "ToolTime"),
+    ("tools.tool_calendar", "ToolCalendar"),
+    ("tools.tool_email", "ToolEmail"),
+    ("tools.tool_file_reader", "ToolFileReader"),
+    ("tools.tool_file_writer", "ToolFileWriter"),
+    ("tools.tool_fs_write", "ToolFSWrite"),
+    ("tools.tool_math", "ToolMath"),
+    ("tools.tool_date_utils", "ToolDateNormalizer"),
+    ("tools.tool_ask_user", "ToolAskUser"),
+    ("tools.tool_path_planner", "ToolPathPlanner"),
+]
@@ -2,11 +2,17 @@
 日程查询工具 - 从本地日程文件读取
 """
 
+import bisect
 import json
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Tuple
 from pathlib import Path
 from datetime import datetime, date
 
+from utils.json_codec import loads as json_loads
+
+# 日程数据文件路径（相对项目根目录固定，模块加载时解析一次）
+_DATA_FILE = Path(__file__).resolve().parent.parent / "data" / "calendar.json"
+
 
 class ToolCalendar:
     """日程查询工具"""
@@ -34,10 +40,12 @@ class ToolCalendar:
             "required": []
         }
 
-        # 日程数据文件路径
-        self.data_file = Path(__file__).parent.parent / "data" / "calendar.json"
+        self.data_file = _DATA_FILE
         self._ensure_data_file()
 
+        # 日程缓存：(mtime_ns, size, 按日期排序的日程, 对应的日期列表)，文件变化时重新加载
+        self._cache: Optional[Tuple[int, int, List[Dict[str, Any]], List[date]]] = None
+
     def _ensure_data_file(self):
         """确保数据文件存在"""
         self.data_file.parent.mkdir(parents=True, exist_ok=True)
@@ -74,23 +82,43 @@ class ToolCalendar:
             with open(self.data_file, 'w', encoding='utf-8') as f:
                 json.dump(sample_data, f, indent=2, ensure_ascii=False)
 
-    def _load_calendar_data(self) -> List[Dict[str, Any]]:
-        """加载日程数据"""
+    def _load_calendar_data(self) -> Tuple[List[Dict[str, Any]], List[date]]:
+        """
+        加载日程数据（按文件mtime和大小缓存）
+
+        Returns:
+            (按日期排序的日程列表, 与之一一对应的日期列表)
+        """
         try:
-            with open(self.data_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            st = self.data_file.stat()
+            cache = self._cache
+            if cache is not None and cache[0] == st.st_mtime_ns and cache[1] == st.st_size:
+                return cache[2], cache[3]
+
+            events = json_loads(self.data_file.read_bytes())
+
+            dated = sorted(((self._parse_date(event["start"]), event) for event in events), key=lambda item: item[0])
+            event_dates = [event_date for event_date, _ in dated]
+            events = [event for _, event in dated]
+            self._cache = (st.st_mtime_ns, st.st_size, events, event_dates)
+            return events, event_dates
         except Exception as e:
             raise ValueError(f"加载日程数据失败: {e}")
 
     def _parse_date(self, date_str: str) -> date:
         """解析日期字符串"""
         try:
-            if 'T' in date_str:
-                # 包含时间的格式
-                return datetime.fromisoformat(date_str.replace('Z', '+00:00')).date()
-            else:
+            if len(date_str) == 10:
                 # 纯日期格式
-                return datetime.strptime(date_str, "%Y-%m-%d").date()
+                return date.fromisoformat(date_str)
+            # 包含时间的格式
+            return datetime.fromisoformat(date_str.replace('Z', '+00:00')).date()
+        except ValueError:
+            pass
+
+        try:
+            # 兼容未补零的日期（如 2025-1-5）
+            return datetime.strptime(date_str, "%Y-%m-%d").date()
         except ValueError:
             raise ValueError(f"无效的日期格式: {date_str}")
 
@@ -121,20 +149,17 @@ class ToolCalendar:
                 raise ValueError("开始日期不能晚于结束日期")
 
             # 加载数据
-            all_events = self._load_calendar_data()
+            all_events, event_dates = self._load_calendar_data()
 
-            # 过滤日期范围内的日程
-            filtered_events = []
-            for event in all_events:
-                event_date = self._parse_date(event["start"])
-                if start <= event_date <= end:
-                    filtered_events.append(event)
+            # 二分查找日期范围内的日程
+            lo = bisect.bisect_left(event_dates, start)
+            hi = bisect.bisect_right(event_dates, end)
 
             # 按开始时间排序
-            filtered_events.sort(key=lambda x: x["start"])
+            filtered_events = sorted(all_events[lo:hi], key=lambda x: x["start"])
 
-            # 限制数量
-            filtered_events = filtered_events[:limit]
+            # 限制数量（返回副本，避免调用方修改缓存）
+            filtered_events = [dict(event) for event in filtered_events[:limit]]
 
             result = {
                 "query": {
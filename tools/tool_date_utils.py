@@ -2,12 +2,44 @@
 日期归一化工具 - 将自然语言日期转换为标准格式
 """
 
+import re
 import time
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta, tzinfo
+from functools import lru_cache
 from typing import Optional
 from dateutil import parser as date_parser
 from dateutil.tz import gettz
-from schemas.tool_result import StandardToolResult, ToolError, ErrorCode, create_tool_meta, create_tool_error
+from schemas.tool_result import StandardToolResult, ToolError, ErrorCode, create_tool_meta_since, create_tool_error
+
+
+# 年在前的数字日期（2024-01-15、2024/1/15）
+_YMD_DATE_RE = re.compile(r"^\s*(\d{4})([-/])(\d{1,2})\2(\d{1,2})\s*$")
+
+
+# 相对日期关键词 -> 相对今天的天数
+_RELATIVE_DAY_KEYWORDS = {
+    "today": 0, "今天": 0,
+    "tomorrow": 1, "明天": 1,
+    "yesterday": -1, "昨天": -1,
+    "day after tomorrow": 2, "后天": 2,
+}
+
+
+def _parse_ymd(date_str: str) -> Optional[date]:
+    """解析年在前的数字日期，格式不符或日期无效时返回None（交给dateutil处理）"""
+    match = _YMD_DATE_RE.match(date_str)
+    if match is None:
+        return None
+    try:
+        return date(int(match[1]), int(match[3]), int(match[4]))
+    except ValueError:
+        return None
+
+
+@lru_cache(maxsize=512)
+def _get_tz(tz: str) -> Optional[tzinfo]:
+    """按名称获取时区（UTC时返回None），结果按名称缓存，避免重复查找时区文件"""
+    return None if tz == "UTC" else gettz(tz)
 
 
 def normalize_date(date_str: str, tz: str = "UTC") -> str:
@@ -24,19 +56,19 @@ def normalize_date(date_str: str, tz: str = "UTC") -> str:
     Raises:
         ValueError: 无法解析日期
     """
+    # 年在前的数字日期直接构造，不经过dateutil
+    ymd = _parse_ymd(date_str)
+    if ymd is not None:
+        return ymd.strftime("%Y-%m-%d")
+
     try:
         # 获取时区
-        timezone = gettz(tz) if tz != "UTC" else None
+        timezone = _get_tz(tz)
 
         # 解析日期
-        if date_str.lower() in ["today", "今天"]:
-            date_obj = datetime.now(timezone).date()
-        elif date_str.lower() in ["tomorrow", "明天"]:
-            date_obj = (datetime.now(timezone) + timedelta(days=1)).date()
-        elif date_str.lower() in ["yesterday", "昨天"]:
-            date_obj = (datetime.now(timezone) - timedelta(days=1)).date()
-        elif date_str.lower() in ["day after tomorrow", "后天"]:
-            date_obj = (datetime.now(timezone) + timedelta(days=2)).date()
+        days_offset = _RELATIVE_DAY_KEYWORDS.get(date_str.strip().lower())
+        if days_offset is not None:
+            date_obj = (datetime.now(timezone) + timedelta(days=days_offset)).date()
         else:
             # 尝试解析其他格式
             try:
@@ -89,13 +121,12 @@ class ToolDateNormalizer:
         Returns:
             标准化的工具结果
         """
-        start_time = time.time()
+        start_ns = time.perf_counter_ns()
 
         try:
             normalized_date = normalize_date(date, timezone)
 
-            latency_ms = int((time.time() - start_time) * 1000)
-            meta = create_tool_meta(self.name, latency_ms, {
+            meta = create_tool_meta_since(self.name, start_ns, {
                 "date": date,
                 "timezone": timezone
             })
@@ -107,18 +138,16 @@ class ToolDateNormalizer:
             }, meta)
 
         except ValueError as e:
-            latency_ms = int((time.time() - start_time) * 1000)
             error = create_tool_error(ErrorCode.INVALID_INPUT, str(e), retryable=False)
-            meta = create_tool_meta(self.name, latency_ms, {
+            meta = create_tool_meta_since(self.name, start_ns, {
                 "date": date,
                 "timezone": timezone
             })
             return StandardToolResult.failure(error, meta)
 
         except Exception as e:
-            latency_ms = int((time.time() - start_time) * 1000)
             error = create_tool_error(ErrorCode.INTERNAL, f"日期归一化失败: {str(e)}", retryable=True)
-            meta = create_tool_meta(self.name, latency_ms, {
+            meta = create_tool_meta_since(self.name, start_ns, {
                 "date": date,
                 "timezone": timezone
             })
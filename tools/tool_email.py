@@ -3,10 +3,12 @@
 """
 
 import json
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Tuple
 from pathlib import Path
 from datetime import datetime, timedelta
 
+from utils.json_codec import loads as json_loads
+
 
 class ToolEmail:
     """邮件读取工具"""
@@ -43,6 +45,9 @@ class ToolEmail:
         self.data_file = Path(__file__).parent.parent / "data" / "mailbox.json"
         self._ensure_data_file()
 
+        # 邮件缓存：(mtime_ns, size, 按接收时间倒序的邮件, 小写发件人, 小写主题)，文件变化时重新加载
+        self._cache: Optional[Tuple[int, int, List[Dict[str, Any]], List[str], List[str]]] = None
+
     def _ensure_data_file(self):
         """确保数据文件存在"""
         self.data_file.parent.mkdir(parents=True, exist_ok=True)
@@ -106,11 +111,26 @@ class ToolEmail:
             with open(self.data_file, 'w', encoding='utf-8') as f:
                 json.dump(sample_emails, f, indent=2, ensure_ascii=False)
 
-    def _load_email_data(self) -> List[Dict[str, Any]]:
-        """加载邮件数据"""
+    def _load_email_data(self) -> Tuple[List[Dict[str, Any]], List[str], List[str]]:
+        """
+        加载邮件数据（按文件mtime和大小缓存）
+
+        Returns:
+            (按接收时间倒序的邮件列表, 对应的小写发件人列表, 对应的小写主题列表)
+        """
         try:
-            with open(self.data_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            st = self.data_file.stat()
+            cache = self._cache
+            if cache is not None and cache[0] == st.st_mtime_ns and cache[1] == st.st_size:
+                return cache[2], cache[3], cache[4]
+
+            emails = json_loads(self.data_file.read_bytes())
+
+            emails.sort(key=lambda x: x["received"], reverse=True)
+            senders = [email["from"].lower() for email in emails]
+            subjects = [email["subject"].lower() for email in emails]
+            self._cache = (st.st_mtime_ns, st.st_size, emails, senders, subjects)
+            return emails, senders, subjects
         except Exception as e:
             raise ValueError(f"加载邮件数据失败: {e}")
 
@@ -130,31 +150,30 @@ class ToolEmail:
             邮件列表
         """
         try:
-            # 加载数据
-            all_emails = self._load_email_data()
+            # 加载数据（已按接收时间倒序排序，最新的在前）
+            all_emails, senders, subjects = self._load_email_data()
+            sender_key = sender.lower() if sender else None
+            subject_key = subject_contains.lower() if subject_contains else None
 
             # 应用过滤条件
             filtered_emails = []
-            for email in all_emails:
+            for email, email_sender, email_subject in zip(all_emails, senders, subjects):
                 # 未读过滤
                 if unread_only and email.get("read", True):
                     continue
 
                 # 发件人过滤
-                if sender and sender.lower() not in email["from"].lower():
+                if sender_key and sender_key not in email_sender:
                     continue
 
                 # 主题关键词过滤
-                if subject_contains and subject_contains.lower() not in email["subject"].lower():
+                if subject_key and subject_key not in email_subject:
                     continue
 
                 filtered_emails.append(email)
 
-            # 按接收时间倒序排序（最新的在前）
-            filtered_emails.sort(key=lambda x: x["received"], reverse=True)
-
-            # 限制数量
-            filtered_emails = filtered_emails[:limit]
+            # 限制数量（返回副本，避免调用方修改缓存）
+            filtered_emails = [dict(email) for email in filtered_emails[:limit]]
 
             result = {
                 "query": {
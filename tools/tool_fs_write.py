@@ -8,7 +8,7 @@ import time
 from pathlib import Path
 from typing import Dict, Any, Optional
 from config import get_config
-from schemas.tool_result import StandardToolResult, ToolError, ErrorCode, create_tool_meta, create_tool_error
+from schemas.tool_result import StandardToolResult, ToolError, ErrorCode, create_tool_meta_since, create_tool_error
 
 
 class ToolFSWrite:
@@ -117,7 +117,7 @@ class ToolFSWrite:
         Returns:
             标准化的工具结果 {ok, data, error, meta}
         """
-        start_time = time.time()
+        start_ns = time.perf_counter_ns()
 
         try:
             # 生成文件路径
@@ -127,8 +127,7 @@ class ToolFSWrite:
             result = self._write_file(file_path, content)
 
             # 创建成功结果
-            latency_ms = int((time.time() - start_time) * 1000)
-            meta = create_tool_meta(self.name, latency_ms, {
+            meta = create_tool_meta_since(self.name, start_ns, {
                 "filename": filename,
                 "format": format,
                 "content_length": len(content),
@@ -139,14 +138,13 @@ class ToolFSWrite:
 
         except ValueError as e:
             # 验证错误
-            latency_ms = int((time.time() - start_time) * 1000)
             error_code = "INVALID_INPUT"
             error = {
                 "code": error_code,
                 "message": str(e),
                 "retryable": False
             }
-            meta = create_tool_meta(self.name, latency_ms, {
+            meta = create_tool_meta_since(self.name, start_ns, {
                 "filename": filename,
                 "format": format
             })
@@ -155,13 +153,12 @@ class ToolFSWrite:
 
         except PermissionError as e:
             # 权限错误
-            latency_ms = int((time.time() - start_time) * 1000)
             error = {
                 "code": "PERMISSION_DENIED",
                 "message": f"权限不足: {str(e)}",
                 "retryable": False
             }
-            meta = create_tool_meta(self.name, latency_ms, {
+            meta = create_tool_meta_since(self.name, start_ns, {
                 "filename": filename,
                 "format": format
             })
@@ -169,13 +166,12 @@ class ToolFSWrite:
 
         except OSError as e:
             # 文件系统错误
-            latency_ms = int((time.time() - start_time) * 1000)
             error = {
                 "code": "FILESYSTEM_ERROR",
                 "message": f"文件系统错误: {str(e)}",
                 "retryable": True
             }
-            meta = create_tool_meta(self.name, latency_ms, {
+            meta = create_tool_meta_since(self.name, start_ns, {
                 "filename": filename,
                 "format": format
             })
@@ -183,13 +179,12 @@ class ToolFSWrite:
 
         except Exception as e:
             # 其他未知错误
-            latency_ms = int((time.time() - start_time) * 1000)
             error = {
                 "code": "INTERNAL_ERROR",
                 "message": f"写入失败: {str(e)}",
                 "retryable": True
             }
-            meta = create_tool_meta(self.name, latency_ms, {
+            meta = create_tool_meta_since(self.name, start_ns, {
                 "filename": filename,
                 "format": format
             })
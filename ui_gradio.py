@@ -9,7 +9,7 @@ import time
 import uuid
 from datetime import datetime
 import gradio as gr
-from typing import List, Tuple, Dict, Any, Optional
+from typing import List, Tuple, Dict, Any, Optional, Callable
 
 from agent_core import create_agent_core_with_llm
 from config import get_config
@@ -22,6 +22,36 @@ setup_logging(config.log_level)
 logger = get_logger()
 
 
+# 流式事件路由：事件类型 -> 处理函数，处理函数返回 (结果字段, 文本) 或 None（不输出）
+def _route_content(chunk: Dict[str, Any]) -> Optional[Tuple[str, str]]:
+    """助手内容片段追加到聊天"""
+    content_piece = chunk.get("content", "")
+    return ("chat_append", content_piece) if content_piece else None
+
+
+def _route_status(icon: str) -> Callable[[Dict[str, Any]], Optional[Tuple[str, str]]]:
+    """生成带图标前缀的状态栏处理函数"""
+    def handler(chunk: Dict[str, Any]) -> Optional[Tuple[str, str]]:
+        message = chunk.get("message", "")
+        return ("status_text", f"{icon} {message}") if message else None
+    return handler
+
+
+def _route_error(chunk: Dict[str, Any]) -> Optional[Tuple[str, str]]:
+    """错误信息写入错误栏"""
+    return "error_text", chunk.get("message", "未知错误")
+
+
+_STREAM_EVENT_HANDLERS: Dict[str, Callable[[Dict[str, Any]], Optional[Tuple[str, str]]]] = {
+    "assistant_content": _route_content,
+    "status": _route_status("🔄"),
+    "tool_trace": _route_status("🔧"),
+    "debug": _route_status("🐛"),
+    "error": _route_error,
+    "content": _route_content,  # 兼容旧格式
+}
+
+
 class ChatUI:
     """聊天UI类"""
 
@@ -243,33 +273,14 @@ class ChatUI:
 
     def _route_stream_event(self, chunk: Dict[str, Any]) -> Dict[str, Optional[str]]:
         """集中管理流式事件路由，返回应写入聊天与状态栏的文本"""
-        chunk_type = chunk.get("type", "")
         result = {"chat_append": None, "status_text": None, "error_text": None}
 
-        if chunk_type == "assistant_content":
-            content_piece = chunk.get("content", "")
-            if content_piece:
-                result["chat_append"] = content_piece
-        elif chunk_type == "status":
-            message = chunk.get("message", "")
-            if message:
-                result["status_text"] = f"🔄 {message}"
-        elif chunk_type == "tool_trace":
-            message = chunk.get("message", "")
-            if message:
-                result["status_text"] = f"🔧 {message}"
-        elif chunk_type == "debug":
-            message = chunk.get("message", "")
-            if message:
-                result["status_text"] = f"🐛 {message}"
-        elif chunk_type == "error":
-            message = chunk.get("message", "未知错误")
-            result["error_text"] = message
-        elif chunk_type == "content":
-            # 兼容旧格式
-            content_piece = chunk.get("content", "")
-            if content_piece:
-                result["chat_append"] = content_piece
+        # 按事件类型查表分发，未知类型不输出
+        handler = _STREAM_EVENT_HANDLERS.get(chunk.get("type", ""))
+        if handler is not None:
+            routed = handler(chunk)
+            if routed is not None:
+                result[routed[0]] = routed[1]
 
         return result
 
@@ -0,0 +1,49 @@
+"""
+ID生成工具
+会话ID、请求ID等高频非密码学用途的UUID生成
+"""
+import os
+import random
+import threading
+import uuid
+
+# STRICT_UUID=true 时退回 uuid.uuid4()（每次读取系统随机源）
+_STRICT_UUID = os.getenv("STRICT_UUID", "false").lower() == "true"
+
+# 每个线程一个由 os.urandom 播种的随机数生成器，避免每次生成都走系统调用
+_tls = threading.local()
+
+
+def _reset_after_fork():
+    """子进程重新播种，避免与父进程生成相同的ID序列"""
+    global _tls
+    _tls = threading.local()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def fast_uuid4() -> str:
+    """
+    生成规范格式的UUID4字符串（xxxxxxxx-xxxx-4xxx-yxxx-xxxxxxxxxxxx）
+
+    不创建UUID对象，也不在每次调用时读取系统随机源；
+    不适用于需要密码学安全随机数的场景
+
+    Returns:
+        str: UUID4字符串
+    """
+    if _STRICT_UUID:
+        return str(uuid.uuid4())
+
+    rng = getattr(_tls, "rng", None)
+    if rng is None:
+        rng = _tls.rng = random.Random(os.urandom(32))
+
+    # 设置版本号(4)和变体位(10xx)
+    value = rng.getrandbits(128)
+    value = (value & ~(0xF000 << 64)) | (0x4000 << 64)
+    value = (value & ~(0xC000 << 48)) | (0x8000 << 48)
+    h = f"{value:032x}"
+    return f"{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}"
@@ -0,0 +1,52 @@
+"""
+JSON编解码工具
+持久化路径（telemetry、session状态）共用，优先使用orjson，未安装时回退到标准库json
+"""
+import json
+from typing import Any
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+def _default(obj: Any) -> Any:
+    """序列化JSON不支持的对象（集合、pydantic模型）"""
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if hasattr(obj, "model_dump"):
+        return obj.model_dump()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(obj: Any, indent: bool = False) -> bytes:
+    """
+    序列化为UTF-8编码的JSON字节串
+
+    Args:
+        obj: 待序列化对象
+        indent: 是否以2空格缩进输出
+
+    Returns:
+        bytes: JSON字节串（不含结尾换行）
+    """
+    if ORJSON_AVAILABLE:
+        option = orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=_default, option=option)
+
+    if indent:
+        text = json.dumps(obj, ensure_ascii=False, indent=2, default=_default)
+    else:
+        text = json.dumps(obj, ensure_ascii=False, separators=(',', ':'), default=_default)
+    return text.encode('utf-8')
+
+
+def loads(data: Any) -> Any:
+    """解析JSON（接受str或bytes）"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
@@ -2,13 +2,16 @@
 Telemetry v1 模块
 记录 6 类关键事件到 logs/errors.jsonl
 """
-import json
+import os
 import time
+import atexit
+import threading
 import uuid
 from typing import Dict, Any, Optional, List
 from pathlib import Path
 from enum import Enum
 
+from utils.json_codec import dumps as json_dumps
 from logger import get_logger
 
 logger = get_logger()
@@ -48,6 +51,26 @@ class TelemetryLogger:
         self.log_file = Path(log_file)
         self.log_file.parent.mkdir(parents=True, exist_ok=True)
 
+        # 常驻打开的追加写文件描述符（首次写入时打开，退出时关闭）
+        # O_APPEND只保证每次写入前定位到文件末尾是原子的；PIPE_BUF的不交错保证只针对管道/FIFO，
+        # 普通文件没有这一保证，因此写入与描述符的打开、关闭一样在锁内进行
+        self._fd = None
+        self._lock = threading.Lock()
+        atexit.register(self.close)
+
+    def _get_fd(self) -> int:
+        """获取日志文件描述符（调用方持有_lock）"""
+        if self._fd is None:
+            self._fd = os.open(str(self.log_file), os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        return self._fd
+
+    def close(self):
+        """关闭日志文件"""
+        with self._lock:
+            if self._fd is not None:
+                os.close(self._fd)
+                self._fd = None
+
     def log_event(self,
                   stage: TelemetryStage,
                   event: TelemetryEvent,
@@ -88,9 +111,12 @@ class TelemetryLogger:
 
         # 写入日志文件
         try:
-            with open(self.log_file, 'a', encoding='utf-8') as f:
-                json.dump(log_entry, f, ensure_ascii=False)
-                f.write('\n')
+            # 整行直接os.write追加写入，绕过Python io缓冲层；短写时续写剩余部分
+            data = memoryview(json_dumps(log_entry) + b'\n')
+            with self._lock:
+                fd = self._get_fd()
+                while data:
+                    data = data[os.write(fd, data):]
 
             logger.info(f"遥测事件已记录: {event.value} ({stage.value})")
 